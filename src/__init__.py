@@ -7,6 +7,7 @@ __author__ = "IIT/NIT Research Project"
 
 from .learner_profiling import LearnerProfile, LearnerProfileManager
 from .knowledge_tracing import SimplifiedDKT, KnowledgeTracingEvaluator
+from .knowledge_vector import KnowledgeVector
 from .learning_path import LearningPathGenerator, AdaptivePathManager
 from .adaptive_quiz import AdaptiveQuizEngine, QuestionBank
 from .tutor_agent import PersonalizedTutorAgent
@@ -17,6 +18,7 @@ __all__ = [
     'LearnerProfileManager',
     'SimplifiedDKT',
     'KnowledgeTracingEvaluator',
+    'KnowledgeVector',
     'LearningPathGenerator',
     'AdaptivePathManager',
     'AdaptiveQuizEngine',
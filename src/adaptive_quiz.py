@@ -7,12 +7,26 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 import random
+import sys
 from src.courses import CourseManager
 
+# Canonical difficulty labels so bank comparisons hit the identity fast path
+_DIFF_INTERN = {'Easy': 'Easy', 'Medium': 'Medium', 'Hard': 'Hard'}
+
+
+def _intern_label(value) -> str:
+    """Return an interned string for a concept/difficulty/bloom label"""
+    value = str(value)
+    return _DIFF_INTERN.get(value) or sys.intern(value)
+
 
 class Question:
     """Represents a quiz question"""
     
+    __slots__ = ('question_id', 'concept', 'difficulty', 'bloom_level',
+                 'estimated_time', 'attempts', 'correct', 'total_time',
+                 'discrimination_index')
+    
     def __init__(self, question_id: int, concept: str, difficulty: str,
                  bloom_level: str = 'Understand', estimated_time: int = 30):
         """
@@ -73,15 +87,34 @@ class QuestionBank:
         """
         self.questions: Dict[int, Question] = {}
         
-        for _, row in questions_df.iterrows():
+        # Pull each column out once instead of building a Series per row
+        n = len(questions_df)
+        columns = zip(
+            questions_df['question_id'].tolist(),
+            questions_df['concept'].tolist(),
+            questions_df['difficulty'].tolist(),
+            questions_df['bloom_level'].tolist() if 'bloom_level' in questions_df else ['Understand'] * n,
+            questions_df['avg_solve_time'].tolist() if 'avg_solve_time' in questions_df else [30] * n
+        )
+        for question_id, concept, difficulty, bloom_level, solve_time in columns:
             q = Question(
-                question_id=row['question_id'],
-                concept=row['concept'],
-                difficulty=row['difficulty'],
-                bloom_level=row.get('bloom_level', 'Understand'),
-                estimated_time=int(row.get('avg_solve_time', 30))
+                question_id=question_id,
+                concept=_intern_label(concept),
+                difficulty=_intern_label(difficulty),
+                bloom_level=_intern_label(bloom_level),
+                estimated_time=int(solve_time)
             )
             self.questions[q.question_id] = q
+        
+        # Bucket questions by (concept, difficulty score) for direct selection
+        self._positions: Dict[int, int] = {
+            question_id: i for i, question_id in enumerate(self.questions)
+        }
+        self._buckets: Dict[Tuple[str, int], List[Question]] = {}
+        for q in self.questions.values():
+            self._buckets.setdefault(
+                (q.concept, q.get_difficulty_score()), []
+            ).append(q)
     
     def get_questions_by_concept(self, concept: str,
                                 difficulty: str = None) -> List[Question]:
@@ -95,12 +128,29 @@ class QuestionBank:
         Returns:
             List of matching questions
         """
-        matching = [q for q in self.questions.values() if q.concept == concept]
-        
-        if difficulty:
-            matching = [q for q in matching if q.difficulty == difficulty]
+        if not difficulty:
+            return [q for q in self.questions.values() if q.concept == concept]
+
+        return [q for q in self.questions.values()
+                if q.concept == concept and q.difficulty == difficulty]
+    
+    def get_questions_by_difficulty_score(self, concept: str,
+                                          difficulty_score: int) -> List[Question]:
+        """
+        Get questions for a concept at a numeric difficulty score
         
-        return matching
+        Args:
+            concept: Target concept
+            difficulty_score: 1 (Easy), 2 (Medium) or 3 (Hard)
+            
+        Returns:
+            List of matching questions (in bank order)
+        """
+        return self._buckets.get((concept, difficulty_score), [])
+    
+    def get_bank_position(self, question_id: int) -> int:
+        """Get a question's position in bank order"""
+        return self._positions[question_id]
     
     def get_question_by_id(self, question_id: int) -> Optional[Question]:
         """Get specific question by ID"""
@@ -189,6 +239,25 @@ class AdaptiveQuizEngine:
         self.current_quiz: Dict = {}
         self.questions_presented: List[int] = []
         self.responses: List[Dict] = []
+        
+        # Response frame/statistics and the (list, length) they were built from
+        self._cache_source: Optional[tuple] = None
+        self._responses_df: Optional[pd.DataFrame] = None
+        self._stats_cache: Optional[Dict] = None
+    
+    def _sync_response_cache(self):
+        """
+        Drop the cached frame and statistics if responses has changed
+        
+        Appending to responses or assigning a new list invalidates the cache;
+        editing a recorded response dict in place does not.
+        """
+        responses = self.responses
+        source = self._cache_source
+        if source is None or source[0] is not responses or source[1] != len(responses):
+            self._cache_source = (responses, len(responses))
+            self._responses_df = None
+            self._stats_cache = None
     
     def select_next_question(self, student_id: int, concept: str,
                             student_mastery: float,
@@ -205,39 +274,62 @@ class AdaptiveQuizEngine:
         Returns:
             Selected Question object
         """
-        candidate_questions = self.qbank.get_questions_by_concept(concept)
-        
-        if not candidate_questions:
-            return None
-        
-        # Filter out already used questions
-        available = [q for q in candidate_questions
-                    if q.question_id not in self.questions_presented]
-        
-        if not available:
-            available = candidate_questions
-        
         # Adjust difficulty based on previous answer
         if previous_correct is not None:
             if previous_correct:
                 # Correct: try harder question
-                available.sort(key=lambda q: q.get_difficulty_score(), reverse=True)
+                score_groups = [[3], [2], [1]]
             else:
                 # Incorrect: try easier question
-                available.sort(key=lambda q: q.get_difficulty_score())
+                score_groups = [[1], [2], [3]]
         else:
             # Initial question: match difficulty to mastery
             # Higher mastery = try harder questions
-            available.sort(
-                key=lambda q: abs(q.get_difficulty_score() - (student_mastery * 3))
-            )
+            distance = {score: abs(score - (student_mastery * 3)) for score in (1, 2, 3)}
+            
+            # Equally close scores form one group, picked from in bank order
+            score_groups = []
+            for score in sorted(distance, key=distance.get):
+                if score_groups and not distance[score_groups[-1][0]] < distance[score]:
+                    score_groups[-1].append(score)
+                else:
+                    score_groups.append([score])
+        
+        # Prefer questions not yet presented, fall back to reusing them
+        presented = set(self.questions_presented)
+        selected = self._pick_from_buckets(concept, score_groups, presented)
+        if selected is None:
+            selected = self._pick_from_buckets(concept, score_groups, set())
+        
+        if selected is None:
+            return None
         
-        selected = available[0]
         self.questions_presented.append(selected.question_id)
         return selected
     
+    def _pick_from_buckets(self, concept: str, score_groups: List[List[int]],
+                           exclude: set) -> Optional[Question]:
+        """
+        Return the first question whose ID is not excluded
+        
+        Groups are tried in order; within a group of tied scores the
+        candidate earliest in the bank wins, as a stable sort would pick it.
+        """
+        for group in score_groups:
+            candidates = []
+            for score in group:
+                for q in self.qbank.get_questions_by_difficulty_score(concept, score):
+                    if q.question_id not in exclude:
+                        candidates.append(q)
+                        break
+            if candidates:
+                return min(candidates,
+                           key=lambda q: self.qbank.get_bank_position(q.question_id))
+        return None
+    
     def record_response(self, question_id: int, student_id: int,
-                       is_correct: int, time_spent: int) -> Dict:
+                       is_correct: int, time_spent: int, *,
+                       fast: bool = False) -> Optional[Dict]:
         """
         Record quiz response and determine next action
         
@@ -246,9 +338,11 @@ class AdaptiveQuizEngine:
             student_id: Student ID
             is_correct: 1 if correct, 0 if incorrect
             time_spent: Time spent in seconds
+            fast: Only record the response (for simulations) and skip
+                the feedback text and result dict
             
         Returns:
-            Response dict with feedback
+            Response dict with feedback, or None in fast mode
         """
         question = self.qbank.get_question_by_id(question_id)
         
@@ -256,7 +350,7 @@ class AdaptiveQuizEngine:
             return None
         
         # Update question statistics
-        self.qbank.update_question_statistics(question_id, is_correct, time_spent)
+        question.update_statistics(is_correct, time_spent)
         
         # Record response
         response = {
@@ -270,6 +364,9 @@ class AdaptiveQuizEngine:
         
         self.responses.append(response)
         
+        if fast:
+            return None
+        
         # Generate feedback
         feedback = self._generate_feedback(question, is_correct, time_spent)
         
@@ -297,14 +394,29 @@ class AdaptiveQuizEngine:
         
         return feedback
     
+    def get_responses_frame(self) -> pd.DataFrame:
+        """Get recorded responses as a DataFrame (cached until next response)"""
+        self._sync_response_cache()
+        if self._responses_df is None:
+            self._responses_df = pd.DataFrame(
+                self.responses,
+                columns=['question_id', 'student_id', 'is_correct',
+                         'time_spent', 'concept', 'difficulty']
+            )
+        return self._responses_df
+    
     def get_quiz_statistics(self) -> Dict:
-        """Get statistics for current quiz session"""
+        """Get statistics for current quiz session (a copy of the cached dict)"""
         if not self.responses:
             return {}
         
-        responses_df = pd.DataFrame(self.responses)
+        self._sync_response_cache()
+        if self._stats_cache is not None:
+            return dict(self._stats_cache)
         
-        return {
+        responses_df = self.get_responses_frame()
+        
+        self._stats_cache = {
             'total_questions': len(self.responses),
             'correct_answers': responses_df['is_correct'].sum(),
             'accuracy': responses_df['is_correct'].mean(),
@@ -312,10 +424,12 @@ class AdaptiveQuizEngine:
             'concept_performance': responses_df.groupby('concept')['is_correct'].agg(['sum', 'count', 'mean']).to_dict(),
             'difficulty_distribution': responses_df['difficulty'].value_counts().to_dict()
         }
+        return dict(self._stats_cache)
     
     def should_continue_quiz(self) -> bool:
         """Determine if quiz should continue"""
-        if len(self.responses) < 3:
+        n = len(self.responses)
+        if n < 3:
             return True
         
         recent_accuracy = np.mean([r['is_correct'] for r in self.responses[-5:]])
@@ -325,7 +439,7 @@ class AdaptiveQuizEngine:
             return True
         
         # Stop if too many questions
-        if len(self.responses) >= 10:
+        if n >= 10:
             return False
         
         return True
@@ -403,7 +517,7 @@ class QuizPerformanceAnalyzer:
             Dictionary mapping concepts to common errors
         """
         misconceptions = {}
-        responses_df = pd.DataFrame(quiz_engine.responses)
+        responses_df = quiz_engine.get_responses_frame()
         
         for concept in responses_df['concept'].unique():
             concept_errors = responses_df[
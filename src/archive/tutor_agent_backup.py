@@ -4,79 +4,225 @@ Provides personalized feedback, hints, and encouragement using Groq AI
 Template-based code archived to: src/archive/template_based_tutor_agent.py
 """
 
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from functools import lru_cache
+from itertools import cycle
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 import logging
+import random
+import threading
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Library module: leave logging configuration to the application
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+_BANNER = "=" * 50
+
+# Maximum number of AI responses kept by PersonalizedTutorAgent
+_AI_CACHE_MAXSIZE = 512
+
+# Defaults for generate_immediate_feedback_batch items
+_FEEDBACK_DEFAULTS = MappingProxyType({
+    'student_response': "",
+    'correct_answer': "",
+    'concept': "",
+    'difficulty': "Medium",
+    'mastery_level': 0.5,
+    'time_spent': 30,
+    'estimated_time': 30
+})
+
+# Maximum number of messages kept in a ConversationalTutor history
+_MAX_CONVERSATION_HISTORY = 1000
+
+# Suffix appended to the base explanation for each detail level
+_EXPLANATION_SUFFIXES = {
+    'basic': "",
+    'intermediate': "\n\nKey points to remember:\n• First, understand the fundamentals.\n• Then, apply to problems.\n• Finally, explain to others.",
+    'advanced': "\n\nAdvanced insights:\n• This concept connects to related areas.\n• Real-world applications include...\n• Common misconceptions to avoid..."
+}
+
+
+class _DefaultingDict(dict):
+    """Dict whose unknown keys resolve to its 'default' entry"""
+    
+    def __missing__(self, key):
+        return self['default']
+
+
+# Static template tables shared by every TutorFeedbackGenerator
+_CONCEPT_EXPLANATIONS = MappingProxyType(_DefaultingDict({
+    'Concept_1': 'This concept focuses on foundational principles...',
+    'Concept_2': 'This concept builds on earlier knowledge...',
+    'Concept_3': 'This is an advanced concept requiring practice...',
+    'default': 'Let\'s focus on understanding this concept step by step.'
+}))
+
+_HINT_DATABASE = MappingProxyType(_DefaultingDict({
+    'Concept_1': (
+        'Start by reading the definition carefully.',
+        'Try drawing a diagram or visual representation.',
+        'Look for examples in your study material.',
+        'Apply the concept to a simple real-world scenario.'
+    ),
+    'Concept_2': (
+        'Review the prerequisite concept first.',
+        'Identify the key steps in solving this problem.',
+        'Work through an example solution.',
+        'Try a similar problem with different numbers.'
+    ),
+    'default': (
+        'Read the question carefully and identify what\'s being asked.',
+        'Break the problem into smaller parts.',
+        'Check your understanding with an example.',
+        'Review the relevant concept material.'
+    )
+}))
+
+_MOTIVATIONAL_PHRASES = (
+    'Great effort! Keep practicing.',
+    'You\'re making progress! Don\'t give up.',
+    'Nice try! Let\'s learn from this.',
+    'Every mistake is a learning opportunity.',
+    'Your persistence will pay off!',
+    'You\'re getting closer to mastery!',
+    'Practice makes perfect!',
+    'Don\'t worry, this is challenging for many!'
+)
+
+_ENCOURAGEMENT_PHRASES = MappingProxyType({
+    'excellent': (
+        'Excellent work! You\'ve mastered this concept.',
+        'Outstanding! You clearly understand this well.',
+        'Perfect! You\'re progressing rapidly!',
+        'Superb! Keep up this excellent work!'
+    ),
+    'good': (
+        'Good job! You\'re on the right track.',
+        'Nice! You\'re making solid progress.',
+        'Well done! Keep practicing to master it.',
+        'Impressive! You\'re learning quickly.'
+    ),
+    'needs_improvement': (
+        'Let\'s work on this together.',
+        'Don\'t worry, it gets easier with practice.',
+        'This is a challenging concept; keep trying!',
+        'You\'ll get there with more practice.'
+    )
+})
+
+# Error-analysis focus blocks for mastery < 0.4, < 0.7 and >= 0.7
+_FOCUS_THRESHOLDS = (0.4, 0.7)
+_FOCUS_BLOCKS = (
+    "🎯 Focus Area: You're still building foundational knowledge.\n"
+    "Recommendation: Review basic concepts and practice simpler problems.\n",
+    "🎯 Focus Area: You're progressing well but need more practice.\n"
+    "Recommendation: Practice with more complex problems.\n",
+    "🎯 Focus Area: You're approaching mastery!\n"
+    "Recommendation: Teach others or work on advanced applications.\n"
+)
+
+# Time-based feedback notes indexed by _classify_time tag
+_TIME_ON_PACE, _TIME_SLOW, _TIME_FAST = 0, 1, 2
+_TIME_NOTES = (
+    "",
+    "\n💡 You spent {minutes} min on this - consider a different approach or review the concept.",
+    "\n⚡ That was fast! Make sure you've understood the concept fully."
+)
+
+
+def _classify_time(time_spent: float, estimated_time: float) -> int:
+    """Classify time spent against the estimate as a _TIME_* tag"""
+    if time_spent > estimated_time * 1.5:
+        return _TIME_SLOW
+    if time_spent < estimated_time * 0.4:
+        return _TIME_FAST
+    return _TIME_ON_PACE
+
+
+@lru_cache(maxsize=1024)
+def _format_pct(value: float) -> str:
+    """Format a 0-1 ratio as a one-decimal percentage (memoized)"""
+    return f"{value:.1%}"
+
+
+# Milestone messages keyed by total questions completed
+_MILESTONES = MappingProxyType({
+    10: "\n🎯 Milestone: You've completed 10 questions! Keep going!\n",
+    25: "\n🏆 Milestone: 25 questions done! You're becoming an expert!\n",
+    50: "\n⭐ Milestone: 50 questions! You've shown real dedication!\n"
+})
+
+# Fixed report sections filled with str.format_map
+_QUIZ_SUMMARY_HEADER = (
+    "\n" + _BANNER + "\n"
+    "        QUIZ COMPLETION SUMMARY\n"
+    + _BANNER + "\n"
+    "\n📊 PERFORMANCE:\n"
+    "  Accuracy: {accuracy}\n"
+    "  Questions: {total_questions}\n"
+    "  Time: {avg_time_spent:.0f}s average\n"
+)
+
+_SESSION_REPORT_HEADER = (
+    "\n" + _BANNER + "\n"
+    "      LEARNING SESSION REPORT\n"
+    + _BANNER + "\n"
+    "\n📅 Session Summary:\n"
+    "  Total Questions: {total_questions}\n"
+    "  Overall Accuracy: {accuracy}\n"
+    "  Concepts Covered: {concepts_count}\n"
+    "\n🎖️ Achievements:\n"
+)
+
+_SESSION_REPORT_FOOTER = (
+    "\n💡 Recommendations:\n"
+    "  - Focus on: {weak_concepts}\n"
+    "  - Next: {next_concept}\n"
+    "\n" + _BANNER + "\n"
+)
+
+# Precomposed explanations per detail level, then per concept
+_EXPLANATIONS = MappingProxyType({
+    level: MappingProxyType(_DefaultingDict({
+        concept: base + suffix
+        for concept, base in _CONCEPT_EXPLANATIONS.items()
+    }))
+    for level, suffix in _EXPLANATION_SUFFIXES.items()
+})
 
 
 class TutorFeedbackGenerator:
     """Generates personalized feedback based on performance"""
     
+    __slots__ = ('concept_explanations', 'hint_database',
+                 'motivational_phrases', 'encouragement_phrases',
+                 '_motivational_cycle', '_excellent_cycle', '_good_cycle',
+                 '_cached_hint', '_cached_next_steps', '_cached_error_analysis')
+    
     def __init__(self):
-        """Initialize tutor with feedback templates"""
-        
-        self.concept_explanations = {
-            'Concept_1': 'This concept focuses on foundational principles...',
-            'Concept_2': 'This concept builds on earlier knowledge...',
-            'Concept_3': 'This is an advanced concept requiring practice...',
-            'default': 'Let\'s focus on understanding this concept step by step.'
-        }
-        
-        self.hint_database = {
-            'Concept_1': [
-                'Start by reading the definition carefully.',
-                'Try drawing a diagram or visual representation.',
-                'Look for examples in your study material.',
-                'Apply the concept to a simple real-world scenario.'
-            ],
-            'Concept_2': [
-                'Review the prerequisite concept first.',
-                'Identify the key steps in solving this problem.',
-                'Work through an example solution.',
-                'Try a similar problem with different numbers.'
-            ],
-            'default': [
-                'Read the question carefully and identify what\'s being asked.',
-                'Break the problem into smaller parts.',
-                'Check your understanding with an example.',
-                'Review the relevant concept material.'
-            ]
-        }
-        
-        self.motivational_phrases = [
-            'Great effort! Keep practicing.',
-            'You\'re making progress! Don\'t give up.',
-            'Nice try! Let\'s learn from this.',
-            'Every mistake is a learning opportunity.',
-            'Your persistence will pay off!',
-            'You\'re getting closer to mastery!',
-            'Practice makes perfect!',
-            'Don\'t worry, this is challenging for many!'
-        ]
-        
-        self.encouragement_phrases = {
-            'excellent': [
-                'Excellent work! You\'ve mastered this concept.',
-                'Outstanding! You clearly understand this well.',
-                'Perfect! You\'re progressing rapidly!',
-                'Superb! Keep up this excellent work!'
-            ],
-            'good': [
-                'Good job! You\'re on the right track.',
-                'Nice! You\'re making solid progress.',
-                'Well done! Keep practicing to master it.',
-                'Impressive! You\'re learning quickly.'
-            ],
-            'needs_improvement': [
-                'Let\'s work on this together.',
-                'Don\'t worry, it gets easier with practice.',
-                'This is a challenging concept; keep trying!',
-                'You\'ll get there with more practice.'
-            ]
-        }
+        """Initialize tutor with the shared feedback templates"""
+        self.concept_explanations = _CONCEPT_EXPLANATIONS
+        self.hint_database = _HINT_DATABASE
+        self.motivational_phrases = _MOTIVATIONAL_PHRASES
+        self.encouragement_phrases = _ENCOURAGEMENT_PHRASES
+        
+        # Shuffled phrase cycles: no per-call random draw, no repeats in a row
+        self._motivational_cycle = self._shuffled_cycle(self.motivational_phrases)
+        self._excellent_cycle = self._shuffled_cycle(self.encouragement_phrases['excellent'])
+        self._good_cycle = self._shuffled_cycle(self.encouragement_phrases['good'])
+        
+        # Memoize the deterministic template builders per instance
+        self._cached_hint = lru_cache(maxsize=256)(self._build_hint)
+        self._cached_next_steps = lru_cache(maxsize=256)(self._build_next_steps)
+        self._cached_error_analysis = lru_cache(maxsize=256)(self._build_error_analysis)
+    
+    @staticmethod
+    def _shuffled_cycle(phrases: Tuple[str, ...]):
+        """Endless iterator over a shuffled copy of phrases"""
+        return cycle(random.sample(phrases, len(phrases)))
     
     def generate_immediate_feedback(self, is_correct: bool, 
                                    concept: str, difficulty: str,
@@ -99,8 +245,8 @@ class TutorFeedbackGenerator:
         
         if is_correct:
             # Correct answer feedback
-            accuracy_level = 'excellent' if difficulty == 'Hard' else 'good'
-            feedback = random.choice(self.encouragement_phrases[accuracy_level])
+            phrases = self._excellent_cycle if difficulty == 'Hard' else self._good_cycle
+            feedback = next(phrases)
         else:
             # Incorrect answer feedback
             feedback = "Not quite right, but let's learn from this."
@@ -108,10 +254,9 @@ class TutorFeedbackGenerator:
                 feedback += " This is a challenging question!"
         
         # Add time-based feedback
-        if time_spent > estimated_time * 1.5:
-            feedback += f"\n💡 You spent {int(time_spent / 60)} min on this - consider a different approach or review the concept."
-        elif time_spent < estimated_time * 0.4:
-            feedback += "\n⚡ That was fast! Make sure you've understood the concept fully."
+        time_tag = _classify_time(time_spent, estimated_time)
+        if time_tag:
+            feedback += _TIME_NOTES[time_tag].format(minutes=int(time_spent / 60))
         
         return feedback
     
@@ -128,7 +273,11 @@ class TutorFeedbackGenerator:
         Returns:
             Hint text
         """
-        hints = self.hint_database.get(concept, self.hint_database['default'])
+        return self._cached_hint(concept, hint_level)
+    
+    def _build_hint(self, concept: str, hint_level: int) -> str:
+        """Build hint text (memoized by generate_hint)"""
+        hints = self.hint_database[concept]
         
         # Provide progressively detailed hints
         hint_idx = min(hint_level - 1, len(hints) - 1)
@@ -148,14 +297,10 @@ class TutorFeedbackGenerator:
         Returns:
             Concept explanation
         """
-        base = self.concept_explanations.get(concept, self.concept_explanations['default'])
+        if detail_level not in _EXPLANATION_SUFFIXES:
+            detail_level = 'advanced'
         
-        if detail_level == 'basic':
-            return base
-        elif detail_level == 'intermediate':
-            return base + "\n\nKey points to remember:\n• First, understand the fundamentals.\n• Then, apply to problems.\n• Finally, explain to others."
-        else:  # advanced
-            return base + "\n\nAdvanced insights:\n• This concept connects to related areas.\n• Real-world applications include...\n• Common misconceptions to avoid..."
+        return _EXPLANATIONS[detail_level][concept]
     
     def generate_error_analysis(self, concept: str, common_mistakes: List[str],
                                mastery_level: float) -> str:
@@ -170,25 +315,30 @@ class TutorFeedbackGenerator:
         Returns:
             Error analysis message
         """
-        analysis = f"📊 Error Analysis for {concept}:\n"
-        analysis += f"Current Mastery Level: {mastery_level:.1%}\n\n"
-        
-        if mastery_level < 0.4:
-            analysis += "🎯 Focus Area: You're still building foundational knowledge.\n"
-            analysis += "Recommendation: Review basic concepts and practice simpler problems.\n"
-        elif mastery_level < 0.7:
-            analysis += "🎯 Focus Area: You're progressing well but need more practice.\n"
-            analysis += "Recommendation: Practice with more complex problems.\n"
-        else:
-            analysis += "🎯 Focus Area: You're approaching mastery!\n"
-            analysis += "Recommendation: Teach others or work on advanced applications.\n"
+        # Snap mastery to the grid that reaches the text: its displayed
+        # percentage and its focus bucket
+        return self._cached_error_analysis(
+            concept, _format_pct(mastery_level),
+            bisect_right(_FOCUS_THRESHOLDS, mastery_level),
+            tuple(common_mistakes[:3]) if common_mistakes else ()
+        )
+    
+    def _build_error_analysis(self, concept: str, mastery_pct: str,
+                              focus_idx: int,
+                              common_mistakes: Tuple[str, ...]) -> str:
+        """Build error analysis text (memoized by generate_error_analysis)"""
+        parts = [
+            f"📊 Error Analysis for {concept}:\n",
+            f"Current Mastery Level: {mastery_pct}\n\n",
+            _FOCUS_BLOCKS[focus_idx]
+        ]
         
         if common_mistakes:
-            analysis += "\nCommon Mistakes to Avoid:\n"
-            for i, mistake in enumerate(common_mistakes[:3], 1):
-                analysis += f"  {i}. {mistake}\n"
+            parts.append("\nCommon Mistakes to Avoid:\n")
+            for i, mistake in enumerate(common_mistakes, 1):
+                parts.append(f"  {i}. {mistake}\n")
         
-        return analysis
+        return "".join(parts)
     
     def generate_next_steps(self, concept: str, mastery_level: float,
                            weak_concepts: List[str],
@@ -205,32 +355,44 @@ class TutorFeedbackGenerator:
         Returns:
             Next steps recommendation
         """
-        recommendation = "📚 Your Personalized Learning Path:\n\n"
-        
-        if mastery_level < 0.6:
-            recommendation += f"1. Continue practicing {concept}\n"
-            recommendation += "   - Complete 5 more practice questions\n"
-            recommendation += "   - Review the concept explanation\n"
-            recommendation += "   - Watch tutorial if available\n"
+        # Only the branch taken, the first available concept and the first
+        # two weak concepts affect the text, so they form the cache key
+        return self._cached_next_steps(
+            concept, mastery_level < 0.6,
+            tuple(available_concepts[:1]) if available_concepts else (),
+            tuple(weak_concepts[:2]) if weak_concepts else ()
+        )
+    
+    def _build_next_steps(self, concept: str, needs_practice: bool,
+                          next_concepts: Tuple[str, ...],
+                          weak_concepts: Tuple[str, ...]) -> str:
+        """Build next steps text (memoized by generate_next_steps)"""
+        parts = ["📚 Your Personalized Learning Path:\n\n"]
+        
+        if needs_practice:
+            parts.append(f"1. Continue practicing {concept}\n")
+            parts.append("   - Complete 5 more practice questions\n")
+            parts.append("   - Review the concept explanation\n")
+            parts.append("   - Watch tutorial if available\n")
         else:
-            recommendation += f"1. {concept} - Ready for advanced problems\n"
-            recommendation += "   - Try harder difficulty questions\n"
-            recommendation += "   - Apply to real-world scenarios\n\n"
+            parts.append(f"1. {concept} - Ready for advanced problems\n")
+            parts.append("   - Try harder difficulty questions\n")
+            parts.append("   - Apply to real-world scenarios\n\n")
             
             # Suggest next concept
-            if available_concepts:
-                next_concept = available_concepts[0]
-                recommendation += f"2. Move on to {next_concept}\n"
-                recommendation += f"   - This builds on {concept}\n"
-                recommendation += "   - Start with easier problems\n"
+            if next_concepts:
+                next_concept = next_concepts[0]
+                parts.append(f"2. Move on to {next_concept}\n")
+                parts.append(f"   - This builds on {concept}\n")
+                parts.append("   - Start with easier problems\n")
         
         # Address weak areas
         if weak_concepts:
-            recommendation += f"\n3. Review weak areas:\n"
-            for wc in weak_concepts[:2]:
-                recommendation += f"   - {wc}: Set 15-minute review session\n"
+            parts.append("\n3. Review weak areas:\n")
+            for wc in weak_concepts:
+                parts.append(f"   - {wc}: Set 15-minute review session\n")
         
-        return recommendation
+        return "".join(parts)
     
     def generate_motivational_message(self, mastery_level: float,
                                      total_questions: int,
@@ -248,31 +410,28 @@ class TutorFeedbackGenerator:
         Returns:
             Motivational message
         """
-        message = random.choice(self.motivational_phrases) + "\n\n"
+        parts = [next(self._motivational_cycle), "\n\n"]
         
         # Add progress metrics
-        message += f"📈 Your Progress:\n"
-        message += f"  • Mastery Level: {mastery_level:.1%}\n"
-        message += f"  • Questions Completed: {total_questions}\n"
-        message += f"  • Accuracy: {accuracy:.1%}\n"
+        parts.append("📈 Your Progress:\n")
+        parts.append(f"  • Mastery Level: {_format_pct(mastery_level)}\n")
+        parts.append(f"  • Questions Completed: {total_questions}\n")
+        parts.append(f"  • Accuracy: {_format_pct(accuracy)}\n")
         
         if streak > 2:
-            message += f"  • 🔥 Current Streak: {streak} correct answers!\n"
+            parts.append(f"  • 🔥 Current Streak: {streak} correct answers!\n")
         
         # Add milestone messages
-        if total_questions == 10:
-            message += "\n🎯 Milestone: You've completed 10 questions! Keep going!\n"
-        elif total_questions == 25:
-            message += "\n🏆 Milestone: 25 questions done! You're becoming an expert!\n"
-        elif total_questions == 50:
-            message += "\n⭐ Milestone: 50 questions! You've shown real dedication!\n"
+        parts.append(_MILESTONES.get(total_questions, ""))
         
-        return message
+        return "".join(parts)
 
 
 class ConversationalTutor:
     """Conversational interface for tutor"""
     
+    __slots__ = ('feedback_gen', 'hint_count', '_roles', '_messages', '_handlers')
+    
     def __init__(self, feedback_generator: TutorFeedbackGenerator):
         """
         Initialize conversational tutor
@@ -281,8 +440,19 @@ class ConversationalTutor:
             feedback_generator: TutorFeedbackGenerator instance
         """
         self.feedback_gen = feedback_generator
-        self.conversation_history: List[Dict[str, str]] = []
         self.hint_count: Dict[str, int] = {}
+        
+        # Bounded history stored as parallel role/message columns
+        self._roles: deque = deque(maxlen=_MAX_CONVERSATION_HISTORY)
+        self._messages: deque = deque(maxlen=_MAX_CONVERSATION_HISTORY)
+        
+        # Intent keywords checked in priority order
+        self._handlers = (
+            ('hint', self._respond_with_hint),
+            ('explain', self._respond_with_explanation),
+            ('help', self._respond_with_help),
+            ('confused', self._respond_with_help)
+        )
     
     def process_student_input(self, student_message: str, 
                             context: Dict) -> str:
@@ -297,36 +467,46 @@ class ConversationalTutor:
             Tutor response
         """
         # Simple intent detection
-        if 'hint' in student_message.lower():
-            concept = context.get('concept', 'default')
-            hint_count = self.hint_count.get(concept, 0) + 1
-            self.hint_count[concept] = hint_count
-            return self.feedback_gen.generate_hint(concept, hint_level=hint_count)
-        
-        elif 'explain' in student_message.lower():
-            concept = context.get('concept', 'default')
-            return self.feedback_gen.generate_concept_explanation(
-                concept, detail_level='basic'
-            )
+        message = student_message.lower()
+        for keyword, handler in self._handlers:
+            if keyword in message:
+                return handler(context.get('concept', 'default'))
         
-        elif 'help' in student_message.lower() or 'confused' in student_message.lower():
-            concept = context.get('concept', 'default')
-            return "I understand! Let me help you.\n\n" + \
-                   self.feedback_gen.generate_concept_explanation(concept, 'intermediate')
-        
-        else:
-            return "I'm here to help! You can ask for: \n- 'hint' for help\n- 'explain' for concept details\n- 'next steps' for recommendations"
+        return "I'm here to help! You can ask for: \n- 'hint' for help\n- 'explain' for concept details\n- 'next steps' for recommendations"
+    
+    def _respond_with_hint(self, concept: str) -> str:
+        """Give the next progressive hint for a concept"""
+        hint_count = self.hint_count.get(concept, 0) + 1
+        self.hint_count[concept] = hint_count
+        return self.feedback_gen.generate_hint(concept, hint_level=hint_count)
+    
+    def _respond_with_explanation(self, concept: str) -> str:
+        """Give a basic concept explanation"""
+        return self.feedback_gen.generate_concept_explanation(
+            concept, detail_level='basic'
+        )
+    
+    def _respond_with_help(self, concept: str) -> str:
+        """Give an intermediate explanation for a struggling student"""
+        return "I understand! Let me help you.\n\n" + \
+               self.feedback_gen.generate_concept_explanation(concept, 'intermediate')
     
     def add_to_conversation(self, role: str, message: str):
-        """Add message to conversation history"""
-        self.conversation_history.append({
-            'role': role,
-            'message': message
-        })
+        """Add message to conversation history (oldest dropped when full)"""
+        self._roles.append(role)
+        self._messages.append(message)
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get conversation history"""
-        return self.conversation_history
+        return [
+            {'role': role, 'message': message}
+            for role, message in zip(self._roles, self._messages)
+        ]
+    
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        """Conversation history as role/message dicts"""
+        return self.get_conversation_history()
 
 
 class PersonalizedTutorAgent:
@@ -336,6 +516,18 @@ class PersonalizedTutorAgent:
     Features: feedback generation, hints, explanations, and guidance
     """
     
+    __slots__ = ('feedback_gen', 'conversational', 'use_ai', 'groq_ai',
+                 '_ai_requested', '_ai_cache', '_ai_lock')
+    
+    # route -> (GroqAITutor method, TutorFeedbackGenerator method, log label)
+    _ROUTES = {
+        'feedback': ('generate_immediate_feedback', 'generate_immediate_feedback', 'feedback'),
+        'hint': ('generate_hint', 'generate_hint', 'hint'),
+        'explanation': ('generate_explanation', 'generate_concept_explanation', 'explanation'),
+        'next_steps': ('generate_next_steps', 'generate_next_steps', 'next steps'),
+        'motivation': ('generate_motivational_message', 'generate_motivational_message', 'motivation'),
+    }
+    
     def __init__(self, use_ai: bool = True):
         """
         Initialize personalized tutor agent
@@ -347,20 +539,92 @@ class PersonalizedTutorAgent:
         self.conversational = ConversationalTutor(self.feedback_gen)
         self.use_ai = use_ai
         self.groq_ai = None
+        self._ai_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        # Shared agents (get_default_agent) are used from several threads
+        self._ai_lock = threading.Lock()
+        
+        # Groq AI is initialized lazily on the first AI call
+        self._ai_requested = use_ai
+        if not use_ai:
+            logger.info("ℹ️  PersonalizedTutorAgent initialized in template mode")
+    
+    def _ensure_ai(self) -> bool:
+        """
+        Initialize Groq AI on first use if it was requested
         
-        # Initialize Groq AI if requested
-        if use_ai:
+        Returns:
+            True if AI calls can be made
+        """
+        if self._ai_requested:
+            with self._ai_lock:
+                if self._ai_requested and self.groq_ai is None:
+                    try:
+                        from .groq_ai import GroqAITutor
+                        self.groq_ai = GroqAITutor()
+                        logger.info("✅ PersonalizedTutorAgent initialized with AI (Groq)")
+                    except Exception as e:
+                        logger.warning(f"⚠️ Could not initialize Groq AI: {e}")
+                        logger.warning("📝 Falling back to template-based feedback")
+                        self.use_ai = False
+                        self.groq_ai = None
+                    self._ai_requested = False
+        
+        return bool(self.use_ai and self.groq_ai)
+    
+    def _dispatch(self, route: str, ai_kwargs: Dict, template_args: tuple) -> str:
+        """
+        Generate a response with Groq AI, falling back to templates
+        
+        Args:
+            route: Key into _ROUTES
+            ai_kwargs: Keyword arguments for the GroqAITutor method
+            template_args: Positional arguments for the template method
+            
+        Returns:
+            Generated text
+        """
+        ai_name, template_name, label = self._ROUTES[route]
+        if self._ensure_ai():
             try:
-                from .groq_ai import GroqAITutor
-                self.groq_ai = GroqAITutor()
-                logger.info("✅ PersonalizedTutorAgent initialized with AI (Groq)")
+                result = self._cached_ai_call(ai_name, **ai_kwargs)
+                if route == 'hint':
+                    # GroqAITutor hints come without the heading templates add
+                    result = self.groq_ai.format_hint(result, ai_kwargs['hint_level'])
+                return result
             except Exception as e:
-                logger.warning(f"⚠️ Could not initialize Groq AI: {e}")
-                logger.warning("📝 Falling back to template-based feedback")
-                self.use_ai = False
-                self.groq_ai = None
-        else:
-            logger.info("ℹ️  PersonalizedTutorAgent initialized in template mode")
+                logger.warning(f"⚠️ AI {label} failed: {e}. Using templates.")
+        return getattr(self.feedback_gen, template_name)(*template_args)
+    
+    def _cached_ai_call(self, method_name: str, **kwargs) -> str:
+        """
+        Call a Groq AI method through an exact-match LRU cache
+        
+        Args:
+            method_name: Name of the GroqAITutor method to call
+            **kwargs: Keyword arguments for the method
+            
+        Returns:
+            Cached or freshly generated AI response
+        """
+        key = (method_name,) + tuple(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in sorted(kwargs.items())
+        )
+        
+        with self._ai_lock:
+            cached = self._ai_cache.get(key)
+            if cached is not None:
+                self._ai_cache.move_to_end(key)
+                return cached
+        
+        # The request itself runs outside the lock
+        result = getattr(self.groq_ai, method_name)(**kwargs)
+        with self._ai_lock:
+            self._ai_cache[key] = result
+            self._ai_cache.move_to_end(key)
+            if len(self._ai_cache) > _AI_CACHE_MAXSIZE:
+                self._ai_cache.popitem(last=False)
+        return result
     
     def generate_immediate_feedback(self,
                                    is_correct: bool,
@@ -387,28 +651,45 @@ class PersonalizedTutorAgent:
         Returns:
             Feedback message
         """
-        if self.use_ai and self.groq_ai:
+        return self._dispatch(
+            'feedback',
+            dict(is_correct=is_correct,
+                 student_response=student_response,
+                 correct_answer=correct_answer,
+                 concept=concept,
+                 difficulty=difficulty,
+                 mastery_level=mastery_level,
+                 time_spent=time_spent,
+                 estimated_time=estimated_time),
+            (is_correct, concept, difficulty, time_spent, estimated_time)
+        )
+    
+    def generate_immediate_feedback_batch(self, items: List[Dict]) -> List[str]:
+        """
+        Generate immediate feedback for several quiz responses at once
+        
+        Args:
+            items: List of dicts with generate_immediate_feedback keyword
+                arguments (is_correct is required, the rest default)
+            
+        Returns:
+            Feedback messages in the same order as items
+        """
+        items = [{**_FEEDBACK_DEFAULTS, **item} for item in items]
+        
+        if self._ensure_ai():
             try:
-                return self.groq_ai.generate_immediate_feedback(
-                    is_correct=is_correct,
-                    student_response=student_response,
-                    correct_answer=correct_answer,
-                    concept=concept,
-                    difficulty=difficulty,
-                    mastery_level=mastery_level,
-                    time_spent=time_spent,
-                    estimated_time=estimated_time
-                )
+                return self.groq_ai.generate_immediate_feedback_batch(items)
             except Exception as e:
-                logger.warning(f"⚠️ AI feedback failed: {e}. Using templates.")
-                return self.feedback_gen.generate_immediate_feedback(
-                    is_correct, concept, difficulty, time_spent, estimated_time
-                )
-        else:
-            # Use template-based feedback
-            return self.feedback_gen.generate_immediate_feedback(
-                is_correct, concept, difficulty, time_spent, estimated_time
+                logger.warning(f"⚠️ AI batch feedback failed: {e}. Using templates.")
+        
+        return [
+            self.feedback_gen.generate_immediate_feedback(
+                item['is_correct'], item['concept'], item['difficulty'],
+                item['time_spent'], item['estimated_time']
             )
+            for item in items
+        ]
     
     def generate_hint(self,
                      concept: str,
@@ -429,21 +710,15 @@ class PersonalizedTutorAgent:
         Returns:
             Hint text
         """
-        if self.use_ai and self.groq_ai:
-            try:
-                return self.groq_ai.generate_hint(
-                    concept=concept,
-                    question=question,
-                    student_attempt=student_attempt,
-                    hint_level=hint_level,
-                    attempt_number=attempt_number
-                )
-            except Exception as e:
-                logger.warning(f"⚠️ AI hint failed: {e}. Using templates.")
-                return self.feedback_gen.generate_hint(concept, hint_level, attempt_number)
-        else:
-            # Use template-based hints
-            return self.feedback_gen.generate_hint(concept, hint_level, attempt_number)
+        return self._dispatch(
+            'hint',
+            dict(concept=concept,
+                 question=question,
+                 student_attempt=student_attempt,
+                 hint_level=hint_level,
+                 attempt_number=attempt_number),
+            (concept, hint_level, attempt_number)
+        )
     
     def generate_explanation(self,
                            concept: str,
@@ -460,19 +735,13 @@ class PersonalizedTutorAgent:
         Returns:
             Explanation text
         """
-        if self.use_ai and self.groq_ai:
-            try:
-                return self.groq_ai.generate_explanation(
-                    concept=concept,
-                    context=context,
-                    detail_level=detail_level
-                )
-            except Exception as e:
-                logger.warning(f"⚠️ AI explanation failed: {e}. Using templates.")
-                return self.feedback_gen.generate_concept_explanation(concept, detail_level)
-        else:
-            # Use template-based explanation
-            return self.feedback_gen.generate_concept_explanation(concept, detail_level)
+        return self._dispatch(
+            'explanation',
+            dict(concept=concept,
+                 context=context,
+                 detail_level=detail_level),
+            (concept, detail_level)
+        )
     
     def generate_next_steps(self,
                           concept: str,
@@ -493,25 +762,15 @@ class PersonalizedTutorAgent:
         Returns:
             Next steps recommendation
         """
-        if self.use_ai and self.groq_ai:
-            try:
-                return self.groq_ai.generate_next_steps(
-                    concept=concept,
-                    mastery_level=mastery_level,
-                    weak_areas=weak_areas,
-                    available_concepts=available_concepts,
-                    total_questions=total_questions
-                )
-            except Exception as e:
-                logger.warning(f"⚠️ AI next steps failed: {e}. Using templates.")
-                return self.feedback_gen.generate_next_steps(
-                    concept, mastery_level, weak_areas, available_concepts
-                )
-        else:
-            # Use template-based next steps
-            return self.feedback_gen.generate_next_steps(
-                concept, mastery_level, weak_areas, available_concepts
-            )
+        return self._dispatch(
+            'next_steps',
+            dict(concept=concept,
+                 mastery_level=mastery_level,
+                 weak_areas=weak_areas,
+                 available_concepts=available_concepts,
+                 total_questions=total_questions),
+            (concept, mastery_level, weak_areas, available_concepts)
+        )
     
     def generate_motivational_message(self,
                                      mastery_level: float,
@@ -532,25 +791,15 @@ class PersonalizedTutorAgent:
         Returns:
             Motivational message
         """
-        if self.use_ai and self.groq_ai:
-            try:
-                return self.groq_ai.generate_motivational_message(
-                    mastery_level=mastery_level,
-                    total_questions=total_questions,
-                    accuracy=accuracy,
-                    streak=streak,
-                    recent_performance=recent_performance
-                )
-            except Exception as e:
-                logger.warning(f"⚠️ AI motivation failed: {e}. Using templates.")
-                return self.feedback_gen.generate_motivational_message(
-                    mastery_level, total_questions, accuracy, streak
-                )
-        else:
-            # Use template-based motivation
-            return self.feedback_gen.generate_motivational_message(
-                mastery_level, total_questions, accuracy, streak
-            )
+        return self._dispatch(
+            'motivation',
+            dict(mastery_level=mastery_level,
+                 total_questions=total_questions,
+                 accuracy=accuracy,
+                 streak=streak,
+                 recent_performance=recent_performance),
+            (mastery_level, total_questions, accuracy, streak)
+        )
     
     def create_quiz_completion_summary(self, quiz_stats: Dict,
                                       concept: str,
@@ -568,37 +817,51 @@ class PersonalizedTutorAgent:
         Returns:
             Formatted completion summary
         """
-        summary = "\n" + "="*50 + "\n"
-        summary += "        QUIZ COMPLETION SUMMARY\n"
-        summary += "="*50 + "\n"
+        return "".join(self.iter_quiz_completion_summary(
+            quiz_stats, concept, learning_path, weak_concepts
+        ))
+    
+    def iter_quiz_completion_summary(self, quiz_stats: Dict,
+                                     concept: str,
+                                     learning_path: List[Dict],
+                                     weak_concepts: List[str]):
+        """
+        Yield the quiz completion summary piece by piece
         
-        # Performance
-        summary += f"\n📊 PERFORMANCE:\n"
-        summary += f"  Accuracy: {quiz_stats['accuracy']:.1%}\n"
-        summary += f"  Questions: {quiz_stats['total_questions']}\n"
-        summary += f"  Time: {quiz_stats['avg_time_spent']:.0f}s average\n"
+        Args:
+            quiz_stats: Quiz statistics
+            concept: Current concept
+            learning_path: Upcoming learning path
+            weak_concepts: Identified weak concepts
+            
+        Yields:
+            Consecutive chunks of the formatted summary
+        """
+        yield _QUIZ_SUMMARY_HEADER.format_map({
+            'accuracy': _format_pct(quiz_stats['accuracy']),
+            'total_questions': quiz_stats['total_questions'],
+            'avg_time_spent': quiz_stats['avg_time_spent']
+        })
         
         # Feedback
         mastery = 0.5  # Would come from actual KT model
         if quiz_stats['accuracy'] > 0.8:
-            summary += f"\n💪 Excellent work! You've mastered {concept}!\n"
+            yield f"\n💪 Excellent work! You've mastered {concept}!\n"
         elif quiz_stats['accuracy'] > 0.6:
-            summary += f"\n👍 Good progress! Keep practicing {concept}.\n"
+            yield f"\n👍 Good progress! Keep practicing {concept}.\n"
         else:
-            summary += f"\n📚 Keep learning! More practice needed for {concept}.\n"
+            yield f"\n📚 Keep learning! More practice needed for {concept}.\n"
         
         # Next steps
-        summary += f"\n🎯 NEXT STEPS:\n"
+        yield "\n🎯 NEXT STEPS:\n"
         if learning_path:
             next_concept = learning_path[0].get('concept', 'next topic')
-            summary += f"  1. Move on to: {next_concept}\n"
+            yield f"  1. Move on to: {next_concept}\n"
         if weak_concepts:
-            summary += f"  2. Review weak concepts:\n"
+            yield "  2. Review weak concepts:\n"
             for wc in weak_concepts[:2]:
-                summary += f"     - {wc}\n"
-        summary += f"\n"
-        
-        return summary
+                yield f"     - {wc}\n"
+        yield "\n"
     
     def generate_session_report(self, student_data: Dict) -> str:
         """
@@ -610,27 +873,63 @@ class PersonalizedTutorAgent:
         Returns:
             Formatted session report
         """
-        report = "\n" + "="*50 + "\n"
-        report += "      LEARNING SESSION REPORT\n"
-        report += "="*50 + "\n"
+        return "".join(self.iter_session_report(student_data))
+    
+    def iter_session_report(self, student_data: Dict):
+        """
+        Yield the learning session report piece by piece
         
-        report += f"\n📅 Session Summary:\n"
-        report += f"  Total Questions: {student_data.get('total_questions', 0)}\n"
-        report += f"  Overall Accuracy: {student_data.get('accuracy', 0):.1%}\n"
-        report += f"  Concepts Covered: {student_data.get('concepts_count', 0)}\n"
+        Args:
+            student_data: Student performance data
+            
+        Yields:
+            Consecutive chunks of the formatted report
+        """
+        accuracy = student_data.get('accuracy', 0)
+        total_questions = student_data.get('total_questions', 0)
         
-        report += f"\n🎖️ Achievements:\n"
-        if student_data.get('accuracy', 0) > 0.8:
-            report += "  ⭐ High Achiever - Excellent Performance!\n"
-        if student_data.get('total_questions', 0) >= 10:
-            report += "  🏃 Dedicated Learner - Many questions completed!\n"
+        yield _SESSION_REPORT_HEADER.format_map({
+            'total_questions': total_questions,
+            'accuracy': _format_pct(accuracy),
+            'concepts_count': student_data.get('concepts_count', 0)
+        })
         
-        report += f"\n💡 Recommendations:\n"
-        report += f"  - Focus on: {', '.join(student_data.get('weak_concepts', []))}\n"
-        report += f"  - Next: {student_data.get('next_concept', 'Continue learning')}\n"
+        if accuracy > 0.8:
+            yield "  ⭐ High Achiever - Excellent Performance!\n"
+        if total_questions >= 10:
+            yield "  🏃 Dedicated Learner - Many questions completed!\n"
         
-        report += "\n" + "="*50 + "\n"
-        return report
+        yield _SESSION_REPORT_FOOTER.format_map({
+            'weak_concepts': ', '.join(student_data.get('weak_concepts', [])),
+            'next_concept': student_data.get('next_concept', 'Continue learning')
+        })
+
+
+# Shared agents keyed by use_ai, built on first request
+_DEFAULT_AGENTS: Dict[bool, PersonalizedTutorAgent] = {}
+_DEFAULT_AGENTS_LOCK = threading.Lock()
+
+
+def get_default_agent(use_ai: bool = True) -> PersonalizedTutorAgent:
+    """
+    Get a shared PersonalizedTutorAgent instead of building one per request
+    
+    The template tables and caches are safe to share; per-student state
+    such as conversational history should use a dedicated agent.
+    
+    Args:
+        use_ai: Whether the shared agent should use Groq AI
+        
+    Returns:
+        Lazily constructed shared agent
+    """
+    agent = _DEFAULT_AGENTS.get(use_ai)
+    if agent is None:
+        with _DEFAULT_AGENTS_LOCK:
+            agent = _DEFAULT_AGENTS.get(use_ai)
+            if agent is None:
+                agent = _DEFAULT_AGENTS[use_ai] = PersonalizedTutorAgent(use_ai=use_ai)
+    return agent
 
 
 if __name__ == '__main__':
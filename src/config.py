@@ -6,12 +6,60 @@ Priority: Environment Variables > settings.json > Defaults
 
 import json
 import os
-from typing import Dict, Any
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load .env file if it exists
-load_dotenv()
+_ENV_KEY_PLACEHOLDER = "your_groq_api_key_here"
+_FILE_KEY_PLACEHOLDER = "YOUR_GROQ_API_KEY_HERE"
+
+
+@dataclass(frozen=True, repr=False)
+class ResolvedConfig:
+    """Settings flattened once from settings.json so accessors are plain loads"""
+    # Written by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        'groq_api_key', 'groq_model', 'groq_config', 'ai_settings',
+        'feedback_enabled', 'hint_generation_enabled', 'personalized_feedback',
+        'response_timeout', 'retry_attempts', 'log_ai_calls'
+    )
+    
+    groq_api_key: str
+    groq_model: str
+    groq_config: Dict[str, Any]
+    ai_settings: Dict[str, Any]
+    feedback_enabled: bool
+    hint_generation_enabled: bool
+    personalized_feedback: bool
+    response_timeout: int
+    retry_attempts: int
+    log_ai_calls: bool
+    
+    def __repr__(self) -> str:
+        # groq_api_key and groq_config (which also holds the key) stay out,
+        # so logging a config never prints the secret
+        shown = ', '.join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__
+            if name not in ('groq_api_key', 'groq_config')
+        )
+        return f"{type(self).__name__}({shown})"
+
+
+_dotenv_loaded = False
+_dotenv_lock = threading.Lock()
+
+
+def _load_dotenv_once():
+    """Load the .env file (if it exists) the first time a Config is built"""
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    with _dotenv_lock:
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _dotenv_loaded = True
 
 
 class Config:
@@ -24,6 +72,8 @@ class Config:
         Args:
             config_path: Path to settings.json. If None, searches in project root.
         """
+        _load_dotenv_once()
+        
         if config_path is None:
             # Search for settings.json in project root
             possible_paths = [
@@ -32,10 +82,14 @@ class Config:
                 "settings.json"  # Relative to current path
             ]
             
+            # One stat per candidate
             for path in possible_paths:
-                if os.path.exists(path):
-                    config_path = path
-                    break
+                try:
+                    os.stat(path)
+                except OSError:
+                    continue
+                config_path = path
+                break
             
             if config_path is None:
                 raise FileNotFoundError(
@@ -45,6 +99,35 @@ class Config:
         
         self.config_path = config_path
         self.settings = self._load_settings()
+        self._resolved = self._resolve(self.settings)
+        self._env_key: Optional[str] = None
+        self._env_key_valid = False
+    
+    @staticmethod
+    def _resolve(settings: Dict[str, Any]) -> ResolvedConfig:
+        """
+        Resolve every known setting (with defaults) in one pass
+        
+        Args:
+            settings: Raw settings dictionary
+            
+        Returns:
+            Frozen ResolvedConfig
+        """
+        groq = settings.get("groq", {})
+        ai_settings = settings.get("ai_settings", {})
+        return ResolvedConfig(
+            groq_api_key=groq.get("api_key", ""),
+            groq_model=groq.get("model", "mixtral-8x7b-32768"),
+            groq_config=groq,
+            ai_settings=ai_settings,
+            feedback_enabled=ai_settings.get("feedback_enabled", True),
+            hint_generation_enabled=ai_settings.get("hint_generation_enabled", True),
+            personalized_feedback=ai_settings.get("personalized_feedback", True),
+            response_timeout=ai_settings.get("response_timeout", 30),
+            retry_attempts=ai_settings.get("retry_attempts", 3),
+            log_ai_calls=settings.get("logging", {}).get("log_ai_calls", True),
+        )
     
     def _load_settings(self) -> Dict[str, Any]:
         """
@@ -55,11 +138,13 @@ class Config:
         """
         try:
             with open(self.config_path, 'r') as f:
-                return json.load(f)
+                settings = json.load(f)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in settings.json: {e}")
         except FileNotFoundError:
             raise FileNotFoundError(f"settings.json not found at {self.config_path}")
+        
+        return settings
     
     def get_groq_api_key(self) -> str:
         """
@@ -72,15 +157,18 @@ class Config:
         Raises:
             ValueError: If API key is not set or is placeholder
         """
-        # Check environment variable first
-        env_key = os.getenv("GROQ_API_KEY")
-        if env_key and env_key != "your_groq_api_key_here":
+        # Check environment variable first; re-validate only when it changes
+        env_key = os.environ.get("GROQ_API_KEY")
+        if env_key != self._env_key:
+            self._env_key = env_key
+            self._env_key_valid = bool(env_key) and env_key != _ENV_KEY_PLACEHOLDER
+        if self._env_key_valid:
             return env_key
         
         # Check settings.json
-        api_key = self.settings.get("groq", {}).get("api_key", "")
+        api_key = self._resolved.groq_api_key
         
-        if not api_key or api_key == "YOUR_GROQ_API_KEY_HERE":
+        if not api_key or api_key == _FILE_KEY_PLACEHOLDER:
             raise ValueError(
                 "Groq API key not configured!\n"
                 "Choose one of these options:\n\n"
@@ -98,43 +186,44 @@ class Config:
     
     def get_groq_model(self) -> str:
         """Get Groq model name"""
-        return self.settings.get("groq", {}).get("model", "mixtral-8x7b-32768")
+        return self._resolved.groq_model
     
     def get_groq_config(self) -> Dict[str, Any]:
         """Get full Groq configuration"""
-        return self.settings.get("groq", {})
+        return self._resolved.groq_config
     
     def get_ai_settings(self) -> Dict[str, Any]:
         """Get AI feature settings"""
-        return self.settings.get("ai_settings", {})
+        return self._resolved.ai_settings
     
     def is_feedback_enabled(self) -> bool:
         """Check if AI feedback is enabled"""
-        return self.get_ai_settings().get("feedback_enabled", True)
+        return self._resolved.feedback_enabled
     
     def is_hint_generation_enabled(self) -> bool:
         """Check if AI hint generation is enabled"""
-        return self.get_ai_settings().get("hint_generation_enabled", True)
+        return self._resolved.hint_generation_enabled
     
     def is_personalized_feedback_enabled(self) -> bool:
         """Check if personalized feedback is enabled"""
-        return self.get_ai_settings().get("personalized_feedback", True)
+        return self._resolved.personalized_feedback
     
     def get_response_timeout(self) -> int:
         """Get timeout for AI responses in seconds"""
-        return self.get_ai_settings().get("response_timeout", 30)
+        return self._resolved.response_timeout
     
     def get_retry_attempts(self) -> int:
         """Get number of retry attempts for API calls"""
-        return self.get_ai_settings().get("retry_attempts", 3)
+        return self._resolved.retry_attempts
     
     def should_log_ai_calls(self) -> bool:
         """Check if AI calls should be logged"""
-        return self.settings.get("logging", {}).get("log_ai_calls", True)
+        return self._resolved.log_ai_calls
 
 
 # Global config instance
 _config = None
+_config_lock = threading.Lock()
 
 
 def get_config(config_path: str = None) -> Config:
@@ -149,7 +238,9 @@ def get_config(config_path: str = None) -> Config:
     """
     global _config
     if _config is None:
-        _config = Config(config_path)
+        with _config_lock:
+            if _config is None:
+                _config = Config(config_path)
     return _config
 
 
@@ -161,4 +252,5 @@ def reload_config(config_path: str = None):
         config_path: Optional path to settings.json
     """
     global _config
-    _config = Config(config_path)
+    with _config_lock:
+        _config = Config(config_path)
@@ -3,14 +3,123 @@ Evaluation and Analysis Module
 Evaluates personalized vs static learning and measures improvement
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List, Tuple
-from scipy import stats
-import warnings
-warnings.filterwarnings('ignore')
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
+_MASTERY_SCAN_BLOCK = 1024
+_IMPROVEMENT_CACHE_MAXSIZE = 1024
+
+# (data fingerprint, window_size, student_id) -> improvement rate
+_improvement_cache: 'OrderedDict[Tuple[str, int, int], float]' = OrderedDict()
+_improvement_lock = threading.Lock()
+
+
+def invalidate_cache():
+    """Drop all memoised improvement rates"""
+    with _improvement_lock:
+        _improvement_cache.clear()
+
+
+def _frame_fingerprint(interaction_data: pd.DataFrame) -> str:
+    """Content hash of the columns improvement rates depend on"""
+    hashed = pd.util.hash_pandas_object(
+        interaction_data[['student_id', 'timestamp', 'score']], index=False
+    )
+    return hashlib.blake2b(hashed.to_numpy().tobytes(), digest_size=8).hexdigest()
+
+
+def prepare_interactions(interaction_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compact an interaction log for the evaluators
+    
+    Concepts become a categorical (integer codes instead of strings) and the
+    score/is_correct columns become int8 when every value is 0 or 1; partial
+    credit or missing values leave a column as it was.
+    
+    Args:
+        interaction_data: Student interaction dataframe
+        
+    Returns:
+        New dataframe; the input is left untouched
+    """
+    prepared = interaction_data.copy()
+    prepared['concept'] = prepared['concept'].astype('category')
+    for column in ('score', 'is_correct'):
+        if column in prepared and prepared[column].isin((0, 1)).all():
+            prepared[column] = prepared[column].astype(np.int8)
+    return prepared
+
+
+def _dkt_eval_kernel(concept_codes: np.ndarray, scores: np.ndarray,
+                     starts: np.ndarray, ends: np.ndarray,
+                     p_learn: np.ndarray, p_forget: np.ndarray,
+                     p_know: np.ndarray, p_guess: np.ndarray,
+                     initial: np.ndarray, lookahead: int) -> Tuple[int, int]:
+    """
+    Replay SimplifiedDKT over contiguous per-student blocks
+    
+    Mirrors predict_performance/predict_next_state on a list-based knowledge
+    vector. Rows [starts[k], ends[k]) belong to one student, in time order.
+    
+    Returns:
+        Tuple of (correct predictions, total predictions)
+    """
+    codes = concept_codes.tolist()
+    correct = scores.tolist()
+    p_learn, p_forget = p_learn.tolist(), p_forget.tolist()
+    p_know, p_guess = p_know.tolist(), p_guess.tolist()
+    initial = initial.tolist()
+    
+    correct_predictions = 0
+    total_predictions = 0
+    
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        n_steps = end - start - lookahead
+        if n_steps <= 0:
+            continue
+        
+        knowledge = initial.copy()
+        hits = 0
+        
+        for i in range(start, start + n_steps):
+            future = codes[i + lookahead]
+            mastery = knowledge[future]
+            pred_correct = 1 if p_know[future] * mastery + p_guess[future] * (1 - mastery) > 0.5 else 0
+            if pred_correct == correct[i + lookahead]:
+                hits += 1
+            
+            concept = codes[i]
+            mastery = knowledge[concept]
+            if correct[i]:
+                knowledge[concept] = min(1.0, mastery + (1 - mastery) * p_learn[concept])
+            else:
+                knowledge[concept] = max(0.0, mastery - mastery * p_forget[concept])
+        
+        correct_predictions += hits
+        total_predictions += n_steps
+    
+    return correct_predictions, total_predictions
+
+
+def _window_slope(scores: np.ndarray, window_size: int) -> float:
+    """Slope of accuracy across consecutive non-overlapping score windows"""
+    n_windows = len(scores) // window_size
+    
+    if len(scores) < 2 or n_windows < 2:
+        return 0.0
+    
+    windows = scores[:n_windows * window_size].reshape(n_windows, window_size).mean(axis=1)
+    
+    # Least-squares slope in closed form (only the slope is needed)
+    x = np.arange(n_windows) - (n_windows - 1) / 2
+    return (x * (windows - windows.mean())).sum() / (x * x).sum()
 
 
 class LearningEffectivenessEvaluator:
@@ -59,26 +168,55 @@ class LearningEffectivenessEvaluator:
             interaction_data['student_id'] == student_id
         ].sort_values('timestamp')
         
-        if len(student_data) < 2:
-            return 0.0
-        
-        # Calculate moving accuracy
-        scores = student_data['score'].values
-        windows = []
-        
-        for i in range(0, len(scores) - window_size + 1, window_size):
-            window_accuracy = np.mean(scores[i:i+window_size])
-            windows.append(window_accuracy)
-        
-        if len(windows) < 2:
-            return 0.0
-        
-        # Calculate slope
-        x = np.arange(len(windows))
-        y = np.array(windows)
-        slope, _, _, _, _ = stats.linregress(x, y)
+        return _window_slope(student_data['score'].values, window_size)
+    
+    @staticmethod
+    def improvement_rates(interaction_data: pd.DataFrame,
+                          student_ids: List[int],
+                          window_size: int = 10) -> Dict[int, float]:
+        """
+        Measure improvement rates for several students in one pass
+        Results are memoised per data fingerprint; see invalidate_cache()
         
-        return slope
+        Args:
+            interaction_data: Student interaction dataframe
+            student_ids: Target students
+            window_size: Number of questions per window
+            
+        Returns:
+            Dictionary of student_id -> improvement rate (0.0 without data)
+        """
+        fingerprint = _frame_fingerprint(interaction_data)
+        rates = {}
+        missing = []
+        
+        with _improvement_lock:
+            for student_id in student_ids:
+                key = (fingerprint, window_size, student_id)
+                if key in _improvement_cache:
+                    _improvement_cache.move_to_end(key)
+                    rates[student_id] = _improvement_cache[key]
+                else:
+                    rates[student_id] = 0.0
+                    missing.append(student_id)
+        
+        if not missing:
+            return rates
+        
+        wanted = interaction_data[interaction_data['student_id'].isin(missing)]
+        ordered = wanted.sort_values('timestamp', kind='stable')
+        
+        for student_id, scores in ordered.groupby('student_id', sort=False)['score']:
+            rates[student_id] = _window_slope(scores.to_numpy(), window_size)
+        
+        # The slopes above are computed outside the lock
+        with _improvement_lock:
+            for student_id in missing:
+                _improvement_cache[(fingerprint, window_size, student_id)] = rates[student_id]
+            while len(_improvement_cache) > _IMPROVEMENT_CACHE_MAXSIZE:
+                _improvement_cache.popitem(last=False)
+        
+        return rates
     
     @staticmethod
     def concept_mastery_analysis(interaction_data: pd.DataFrame,
@@ -93,25 +231,21 @@ class LearningEffectivenessEvaluator:
         Returns:
             Dictionary with mastery stats per concept
         """
-        student_data = interaction_data[
-            interaction_data['student_id'] == student_id
-        ]
-        
-        analysis = {}
-        
-        for concept in student_data['concept'].unique():
-            concept_data = student_data[student_data['concept'] == concept]
-            
-            scores = concept_data['score'].values
-            
-            analysis[concept] = {
-                'attempts': len(scores),
-                'accuracy': np.mean(scores),
-                'first_attempt_accuracy': scores[0] if len(scores) > 0 else 0,
-                'final_accuracy': scores[-1] if len(scores) > 0 else 0,
-                'improvement': (scores[-1] - scores[0]) if len(scores) > 0 else 0,
-                'learning_efficiency': np.mean(scores)  # Higher = more efficient
-            }
+        student_data = interaction_data[interaction_data['student_id'] == student_id]
+        
+        # One grouped pass instead of re-filtering per concept
+        agg = student_data.groupby('concept', sort=False, observed=True)['score'].agg(
+            ['count', 'mean', 'first', 'last']
+        ).rename(columns={
+            'count': 'attempts',
+            'mean': 'accuracy',
+            'first': 'first_attempt_accuracy',
+            'last': 'final_accuracy'
+        })
+        agg['improvement'] = agg['final_accuracy'] - agg['first_attempt_accuracy']
+        agg['learning_efficiency'] = agg['accuracy']  # Higher = more efficient
+        
+        analysis = agg.to_dict(orient='index')
         
         return analysis
     
@@ -130,28 +264,31 @@ class LearningEffectivenessEvaluator:
         """
         comparison = {}
         
+        pers_scores = personalized_data['score'].to_numpy()
+        static_scores = static_data['score'].to_numpy()
+        
         # Accuracy
-        pers_acc = personalized_data['score'].mean()
-        static_acc = static_data['score'].mean()
+        pers_acc = pers_scores.mean()
+        static_acc = static_scores.mean()
         comparison['accuracy_improvement'] = (pers_acc - static_acc) / static_acc * 100
         
-        # Learning gain
+        # Learning gain (first half vs last half of the attempts)
+        pers_half = len(pers_scores) // 2
+        static_half = len(static_scores) // 2
         pers_gain = LearningEffectivenessEvaluator.calculate_learning_gain(
-            personalized_data.head(len(personalized_data)//2)['score'].values,
-            personalized_data.tail(len(personalized_data)//2)['score'].values
+            pers_scores[:pers_half], pers_scores[len(pers_scores) - pers_half:]
         )
         static_gain = LearningEffectivenessEvaluator.calculate_learning_gain(
-            static_data.head(len(static_data)//2)['score'].values,
-            static_data.tail(len(static_data)//2)['score'].values
+            static_scores[:static_half], static_scores[len(static_scores) - static_half:]
         )
         comparison['learning_gain_improvement'] = (pers_gain - static_gain) / static_gain * 100 if static_gain > 0 else 0
         
         # Efficiency (questions to reach 80% accuracy)
         pers_efficient = LearningEffectivenessEvaluator._questions_to_mastery(
-            personalized_data['score'].values, threshold=0.8
+            pers_scores, threshold=0.8
         )
         static_efficient = LearningEffectivenessEvaluator._questions_to_mastery(
-            static_data['score'].values, threshold=0.8
+            static_scores, threshold=0.8
         )
         comparison['efficiency_gain'] = (static_efficient - pers_efficient) / static_efficient * 100 if static_efficient > 0 else 0
         
@@ -166,14 +303,19 @@ class LearningEffectivenessEvaluator:
     def _questions_to_mastery(scores: np.ndarray,
                              threshold: float = 0.8) -> int:
         """Calculate questions needed to reach mastery threshold"""
-        cumsum = 0
-        count = 0
-        
-        for score in scores:
-            cumsum += score
-            count += 1
-            if cumsum / count >= threshold:
-                return count
+        scores = np.asarray(scores)
+        carry = 0.0
+        
+        # Scan block by block so a long history stops at the first block that
+        # reaches mastery; the carried sum keeps the accumulation sequential
+        for start in range(0, len(scores), _MASTERY_SCAN_BLOCK):
+            block = scores[start:start + _MASTERY_SCAN_BLOCK]
+            cumsum = np.cumsum(np.concatenate(([carry], block)), dtype=np.float64)[1:]
+            reached = cumsum / np.arange(start + 1, start + len(block) + 1) >= threshold
+            idx = int(np.argmax(reached))
+            if reached[idx]:
+                return start + idx + 1
+            carry = cumsum[-1]
         
         return len(scores)
 
@@ -238,32 +380,29 @@ class SystemPerformanceAnalyzer:
         if len(interactions) < lookahead + 1:
             return 0.0
         
-        correct_predictions = 0
-        total_predictions = 0
+        ordered = interactions.sort_values('timestamp', kind='stable')
         
-        student_ids = interactions['student_id'].unique()
+        # Lay students out in contiguous blocks (time order kept inside each)
+        # and drop rows without a student id, which never formed a group
+        student_codes, _ = pd.factorize(ordered['student_id'])
+        keep = np.flatnonzero(student_codes >= 0)
+        keep = keep[np.argsort(student_codes[keep], kind='stable')]
+        student_codes = student_codes[keep]
         
-        for student_id in student_ids:
-            student_data = interactions[
-                interactions['student_id'] == student_id
-            ].sort_values('timestamp').reset_index(drop=True)
-            
-            knowledge = dkt_model.initial_knowledge.copy()
-            
-            for i in range(len(student_data) - lookahead):
-                future_concept = student_data.iloc[i + lookahead]['concept']
-                actual_correct = student_data.iloc[i + lookahead]['score']
-                
-                pred_prob = dkt_model.predict_performance(knowledge, future_concept)
-                pred_correct = 1 if pred_prob > 0.5 else 0
-                
-                if pred_correct == actual_correct:
-                    correct_predictions += 1
-                total_predictions += 1
-                
-                concept = student_data.iloc[i]['concept']
-                correct = student_data.iloc[i]['score']
-                knowledge = dkt_model.predict_next_state(knowledge, concept, correct)
+        # Concepts as indices into the model's exported parameter arrays
+        concept_codes, concept_names = pd.factorize(ordered['concept'].to_numpy()[keep])
+        concept_index = {c: i for i, c in enumerate(dkt_model.concepts)}
+        concept_codes = np.array([concept_index[c] for c in concept_names],
+                                 dtype=np.intp)[concept_codes]
+        
+        boundaries = np.flatnonzero(np.diff(student_codes)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(student_codes)]))
+        
+        correct_predictions, total_predictions = _dkt_eval_kernel(
+            concept_codes, ordered['score'].to_numpy()[keep], starts, ends,
+            *dkt_model.export_params(), lookahead
+        )
         
         return correct_predictions / total_predictions if total_predictions > 0 else 0.0
     
@@ -280,34 +419,30 @@ class SystemPerformanceAnalyzer:
         """
         analysis = {}
         
+        difficulty_order = {'Easy': 0, 'Medium': 1, 'Hard': 2}
+        
+        # Unknown/missing difficulty labels count as Medium
+        diff_codes = (quiz_responses['difficulty'].map(difficulty_order)
+                      .fillna(1).to_numpy(dtype=np.intp))
+        is_correct = quiz_responses['is_correct'].to_numpy()
+        current_diff, next_diff = diff_codes[:-1], diff_codes[1:]
+        
         # Count transitions between difficulty levels
+        counts = np.bincount(current_diff * 3 + next_diff, minlength=9).reshape(3, 3)
         transitions = {
-            'easy_to_medium': 0,
-            'easy_to_hard': 0,
-            'medium_to_easy': 0,
-            'medium_to_hard': 0,
-            'hard_to_medium': 0,
-            'hard_to_easy': 0
+            'easy_to_medium': int(counts[0, 1]),
+            'easy_to_hard': int(counts[0, 2]),
+            'medium_to_easy': int(counts[1, 0]),
+            'medium_to_hard': int(counts[1, 2]),
+            'hard_to_medium': int(counts[2, 1]),
+            'hard_to_easy': int(counts[2, 0])
         }
         
         # Analyze difficulty changes after correct/incorrect
-        correct_then_harder = 0
-        incorrect_then_easier = 0
-        
-        difficulty_order = {'Easy': 0, 'Medium': 1, 'Hard': 2}
-        
-        for i in range(len(quiz_responses) - 1):
-            current = quiz_responses.iloc[i]
-            next_q = quiz_responses.iloc[i + 1]
-            
-            current_diff = difficulty_order.get(current['difficulty'], 1)
-            next_diff = difficulty_order.get(next_q['difficulty'], 1)
-            
-            if current['is_correct'] == 1 and next_diff > current_diff:
-                correct_then_harder += 1
-            elif current['is_correct'] == 0 and next_diff < current_diff:
-                incorrect_then_easier += 1
+        correct_then_harder = int(((is_correct[:-1] == 1) & (next_diff > current_diff)).sum())
+        incorrect_then_easier = int(((is_correct[:-1] == 0) & (next_diff < current_diff)).sum())
         
+        analysis['transitions'] = transitions
         analysis['correct_then_harder_ratio'] = correct_then_harder / (len(quiz_responses) - 1) if len(quiz_responses) > 1 else 0
         analysis['incorrect_then_easier_ratio'] = incorrect_then_easier / (len(quiz_responses) - 1) if len(quiz_responses) > 1 else 0
         analysis['adaptation_quality'] = (analysis['correct_then_harder_ratio'] + analysis['incorrect_then_easier_ratio']) / 2
@@ -320,7 +455,7 @@ class ResultsVisualizer:
     
     @staticmethod
     def plot_learning_curves(student_interactions: pd.DataFrame,
-                            save_path: str = None) -> plt.Figure:
+                            save_path: str = None) -> 'plt.Figure':
         """
         Plot learning curves for students
         
@@ -331,6 +466,8 @@ class ResultsVisualizer:
         Returns:
             Matplotlib figure
         """
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(2, 2, figsize=(14, 10))
         fig.suptitle('Learning Effectiveness Analysis', fontsize=16, fontweight='bold')
         
@@ -380,7 +517,7 @@ class ResultsVisualizer:
     @staticmethod
     def plot_comparison_results(personalized_metrics: Dict,
                                static_metrics: Dict,
-                               save_path: str = None) -> plt.Figure:
+                               save_path: str = None) -> 'plt.Figure':
         """
         Plot comparison between personalized and static learning
         
@@ -392,6 +529,8 @@ class ResultsVisualizer:
         Returns:
             Matplotlib figure
         """
+        import matplotlib.pyplot as plt
+        
         fig, ax = plt.subplots(figsize=(10, 6))
         
         metrics = ['Accuracy', 'Learning Gain', 'Efficiency', 'Time']
@@ -414,11 +553,8 @@ class ResultsVisualizer:
         ax.set_ylim([0, 1])
         
         # Add value labels on bars
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{height:.0%}', ha='center', va='bottom', fontsize=9)
+        ax.bar_label(bars1, fmt='{:.0%}', fontsize=9)
+        ax.bar_label(bars2, fmt='{:.0%}', fontsize=9)
         
         plt.tight_layout()
         
@@ -450,6 +586,8 @@ class EvaluationReport:
         Returns:
             Report text
         """
+        interaction_data = prepare_interactions(interaction_data)
+        
         report = []
         report.append("="*70)
         report.append("   PERSONALIZED TUTOR AGENT - EVALUATION REPORT")
@@ -468,14 +606,10 @@ class EvaluationReport:
         report.append("-" * 70)
         
         student_ids = list(learner_profiles.keys())[:5]
-        avg_improvement = 0
-        
-        for student_id in student_ids:
-            student_data = interaction_data[interaction_data['student_id'] == student_id]
-            improvement = LearningEffectivenessEvaluator.measure_improvement_rate(
-                interaction_data, student_id
-            )
-            avg_improvement += improvement
+        improvement_rates = LearningEffectivenessEvaluator.improvement_rates(
+            interaction_data, student_ids
+        )
+        avg_improvement = sum(improvement_rates[sid] for sid in student_ids)
         
         avg_improvement /= len(student_ids) if student_ids else 1
         report.append(f"   Average Improvement Rate: {avg_improvement:.4f} per session")
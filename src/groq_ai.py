@@ -3,17 +3,254 @@ Groq AI Integration for Personalized Tutor
 Provides AI-powered feedback, hints, and explanations using Groq API
 """
 
+import asyncio
+import atexit
+import hashlib
+import json
 import logging
-from typing import Dict, List, Optional, Any
+import random
+import re
+import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 import time
-from groq import Groq
+import httpx
+from groq import (AsyncGroq, Groq, AuthenticationError, BadRequestError,
+                  NotFoundError, PermissionDeniedError, RateLimitError)
 
 from .config import get_config
 
+# Compact JSON (no ASCII escaping) for prompt payloads, and reply parsing
+try:
+    import orjson
+    _json_loads = orjson.loads  # raises a json.JSONDecodeError subclass
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+except ImportError:
+    import numpy as np
+    
+    def _numpy_default(obj: Any) -> Any:
+        """Encode NumPy values like orjson's OPT_SERIALIZE_NUMPY"""
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+    _json_loads = json.loads
+    _json_dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'),
+                                   default=_numpy_default).encode
+
 # Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_RESPONSE_CACHE_MAXSIZE = 512
+_RESPONSE_CACHE_TTL = 3600  # seconds
+_EXPLANATION_CACHE_MAXSIZE = 1024
+_OUTPUT_SAMPLE_SIZE = 200  # completions remembered per max_tokens budget
+_MAX_RETRY_DELAY = 30.0  # seconds
+
+# Requests the API will reject again unchanged; retrying only adds latency
+_NON_RETRYABLE_ERRORS = (BadRequestError, AuthenticationError,
+                         PermissionDeniedError, NotFoundError)
+
+# Speed tiers: "instant" for short conversational replies, "balanced" for
+# longer structured output; "balanced" defaults to the configured model
+_DEFAULT_MODEL_TIERS = {
+    "instant": "llama-3.1-8b-instant",
+    "fast70b": "llama-3.3-70b-specdec",
+}
+# Question types rotated through for variety in generated quizzes
+_QUESTION_TYPES = (
+    "conceptual understanding",
+    "practical application",
+    "problem-solving scenario",
+    "definition and terminology",
+    "comparative analysis",
+    "real-world use case"
+)
+
+# Expected type of each field in a generated quiz question
+_QUESTION_SCHEMA = {
+    'question': str,
+    'options': list,
+    'correct_answer': str,
+    'correct_index': int,
+    'explanation': str
+}
+
+# Static system prompts: the instructions never vary between calls, so the
+# request prefix is byte-identical and the per-call details travel as a
+# compact JSON user message (see _prompt_payload)
+_FEEDBACK_SYSTEM = """You are a supportive tutor. The user message is JSON describing a student's quiz answer. In 2-3 encouraging sentences, acknowledge effort, praise a correct answer or explain why an incorrect one is wrong, and give one specific learning suggestion."""
+
+_FEEDBACK_BATCH_SYSTEM = """You are a supportive tutor. The user message is a JSON array of students' quiz answers. For each, write 2-3 encouraging sentences that acknowledge effort, praise a correct answer or explain why an incorrect one is wrong, and give one specific learning suggestion. Return ONLY a JSON array of strings, one per answer in order, with no markdown."""
+
+_HINT_SYSTEM = """You are a tutor giving progressive hints. The user message is JSON describing the question and the student's attempt; hint_level runs from 1 (minimal) to 3 (detailed) and hint_style says what to give. Reply with an encouraging 1-2 sentence hint that focuses on the process and does NOT give away the answer."""
+
+_EXPLANATION_SYSTEM = """You are an educator who explains concepts clearly. The user message is JSON with the concept, the depth to explain it at and, optionally, the student's question. Answer briefly and engagingly as:
+1. Definition (1 sentence)
+2. Key Points (2-3 bullets)
+3. Example (practical application)
+4. Connection to Learning (how to remember it)"""
+
+_NEXT_STEPS_SYSTEM = """You are a learning advisor. The user message is JSON describing the student's status. Based on mastery, say whether to continue or move on, address weak areas and encourage the student, formatted as:
+📚 Your Personalized Learning Path:
+1. [Next action with reasoning]
+2. [Step after that]
+3. [Long-term suggestion]"""
+
+_MOTIVATION_SYSTEM = """You are an enthusiastic, genuine coach. The user message is JSON with a student's progress metrics. Write a short, personal motivational message that celebrates specific achievements from the metrics, recognises effort and sets an achievable next goal. Use emoji where fitting."""
+
+_ERROR_PATTERN_SYSTEM = """You are an educational psychologist. The user message is JSON with a concept, the student's mastery and the errors they made. Identify the root cause, 2-3 misconceptions, targeted practice and prevention tips, formatted as:
+📊 Error Analysis:
+🎯 Root Cause: [...]
+❌ Common Misconceptions: [...]
+📋 Recommended Practice: [...]
+✨ Prevention Tips: [...]"""
+
+_QUIZ_SYSTEM = """You are an educator writing varied, non-generic quiz questions. The user message is JSON with the concept, difficulty, question type and the student's mastery. Write one fresh question of that type, suited to the mastery and difficulty, using a specific example, with four plausible options and exactly one correct. Return ONLY valid JSON, no markdown:
+{"question": "...", "options": ["...", "...", "...", "..."], "correct_answer": "<exact copy of the correct option>", "correct_index": <0-3>, "explanation": "why it is correct"}"""
+
+_QUIZ_BATCH_SYSTEM = """You are an educator writing varied, non-generic quiz questions. The user message is JSON with the concept, difficulty, the student's mastery and question_types. Write one distinct question per entry of question_types, in order, suited to the mastery and difficulty, each using a specific example, with four plausible options and exactly one correct. Return ONLY a JSON array of objects, no markdown, each shaped like:
+{"question": "...", "options": ["...", "...", "...", "..."], "correct_answer": "<exact copy of the correct option>", "correct_index": <0-3>, "explanation": "why it is correct"}"""
+
+_HINT_STYLES = {
+    1: "a very subtle hint that points in the right direction without giving away the answer",
+    2: "a more direct hint that explains what approach to use",
+    3: "a detailed explanation of the solution approach"
+}
+
+_DETAIL_PROMPTS = {
+    'basic': 'Provide a clear, simple explanation suitable for a beginner.',
+    'intermediate': 'Provide a moderate-depth explanation with key concepts and connections.',
+    'advanced': 'Provide a detailed explanation including advanced applications and implications.'
+}
+
+# A model's JSON reply with any ``` / ```json fences around it
+_FENCE_RE = re.compile(r"^\s*(?:```(?:json)?)?(.*?)(?:```)?\s*$", re.DOTALL)
+
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Connection pool shared by every GroqAITutor in the process
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def _get_http_client(timeout: float) -> httpx.Client:
+    """Return the shared keep-alive HTTP client (HTTP/2 when h2 is installed)"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None or _http_client.is_closed:
+            try:
+                import h2  # noqa: F401  (optional, enables HTTP/2 multiplexing)
+                http2 = True
+            except ImportError:
+                http2 = False
+            _http_client = httpx.Client(http2=http2, timeout=timeout, limits=_HTTP_LIMITS)
+        return _http_client
+
+
+def close_http_client():
+    """Close the shared HTTP connection pool (registered to run at exit)"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+atexit.register(close_http_client)
+
+# Shared workers for running independent sync API calls concurrently; the
+# Groq client waits on network I/O with the GIL released
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="groq")
+
+
+def _shutdown_pool():
+    """Stop the worker pool at exit, letting in-flight requests finish"""
+    if sys.version_info >= (3, 9):
+        # Queued requests are dropped rather than waited for
+        _POOL.shutdown(wait=True, cancel_futures=True)
+    else:
+        # cancel_futures is new in 3.9; queued requests still run here
+        _POOL.shutdown(wait=True)
+
+
+# Registered after close_http_client so it runs first
+atexit.register(_shutdown_pool)
+
+
+def _parse_json_reply(text: str) -> Any:
+    """Parse a model's JSON reply, ignoring markdown code fences around it"""
+    return _json_loads(_FENCE_RE.match(text).group(1))
+
+
+def _retry_delay(attempt: int, error: Exception) -> Optional[float]:
+    """
+    Seconds to wait before retrying a failed request
+    
+    Args:
+        attempt: Zero-based number of the attempt that failed
+        error: Exception raised by the attempt
+        
+    Returns:
+        Delay honouring a rate limit's Retry-After header when present,
+        otherwise jittered exponential backoff; None if the error should not
+        be retried
+    """
+    if isinstance(error, _NON_RETRYABLE_ERRORS):
+        return None
+    
+    if isinstance(error, RateLimitError):
+        retry_after = error.response.headers.get("retry-after")
+        try:
+            return min(_MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+        except (TypeError, ValueError):
+            pass
+    
+    return min(_MAX_RETRY_DELAY, 2 ** attempt + random.random())
+
+
+def _prompt_payload(**fields: Any) -> str:
+    """Serialise the per-call prompt fields as compact JSON for the user message"""
+    return _json_dumps(fields)
+
+
+def _validate_question(question_data: Any) -> Dict[str, Any]:
+    """
+    Check a generated question against _QUESTION_SCHEMA
+    
+    An out-of-range or non-integer correct_index is reset to 0 rather than
+    rejected; every other deviation rejects the question.
+    
+    Raises:
+        ValueError: If the question is not an object, a field is missing or
+            has the wrong type, or options are not four strings
+    """
+    if not isinstance(question_data, dict):
+        raise ValueError("Question must be a JSON object")
+    
+    for key, expected in _QUESTION_SCHEMA.items():
+        if key not in question_data:
+            raise ValueError(f"Missing required key in response: {key}")
+        if key != 'correct_index' and not isinstance(question_data[key], expected):
+            raise ValueError(f"Field {key} must be {expected.__name__}")
+    
+    options = question_data['options']
+    if len(options) != 4 or not all(isinstance(option, str) for option in options):
+        raise ValueError("options must be a list of four strings")
+    
+    # Validate correct_index
+    index = question_data['correct_index']
+    if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index <= 3:
+        question_data['correct_index'] = 0
+    
+    return question_data
+
 
 class GroqAITutor:
     """AI-powered tutor using Groq API"""
@@ -24,21 +261,101 @@ class GroqAITutor:
         
         try:
             api_key = self.config.get_groq_api_key()
-            self.client = Groq(api_key=api_key)
-            self.model = self.config.get_groq_model()
             self.timeout = self.config.get_response_timeout()
+            self._http = _get_http_client(self.timeout)
+            self.client = Groq(api_key=api_key, http_client=self._http)
+            self.aclient = AsyncGroq(api_key=api_key)
+            self.model = self.config.get_groq_model()
+            self.model_tiers = {
+                **_DEFAULT_MODEL_TIERS,
+                "balanced": self.model,
+                **self.config.get_groq_config().get("model_tiers", {})
+            }
             self.retry_attempts = self.config.get_retry_attempts()
             self.log_calls = self.config.should_log_ai_calls()
             
-            logger.info(f"✅ Groq AI initialized with model: {self.model}")
+            # Guards the caches below, which submit() workers share
+            self._cache_lock = threading.Lock()
+            # (model, messages digest, max_tokens, temperature) -> (timestamp, response)
+            self._response_cache: "OrderedDict[Tuple[str, str, int, float], Tuple[float, str]]" = OrderedDict()
+            # (concept, detail_level, context) -> explanation, least recently used first
+            self._explanation_cache: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+            # max_tokens budget -> recent completion token counts
+            self._output_tokens: Dict[int, deque] = {}
+            # _prefetch_key(...) -> question being generated ahead of time
+            self._prefetch_cache: Dict[Tuple[str, str, str], Future] = {}
+            
+            logger.info("✅ Groq AI initialized with model: %s", self.model)
             
         except ValueError as e:
-            logger.error(f"❌ Failed to initialize Groq AI: {e}")
+            logger.error("❌ Failed to initialize Groq AI: %s", e)
             raise
     
+    def close(self):
+        """
+        Release network resources
+        
+        Closes the connection pool shared by all GroqAITutor instances, so
+        call it at shutdown rather than per instance.
+        """
+        close_http_client()
+    
+    def submit(self, fn_name: str, *args, **kwargs) -> Future:
+        """
+        Run a tutor method on the shared worker pool
+        
+        Lets callers overlap independent requests, e.g. feedback, next steps
+        and a motivational message for the same answer.
+        
+        Args:
+            fn_name: Name of the GroqAITutor method to call
+            *args, **kwargs: Arguments for that method
+            
+        Returns:
+            Future resolving to the method's return value
+        """
+        return _POOL.submit(getattr(self, fn_name), *args, **kwargs)
+    
+    def _record_output(self, max_tokens: int, response: Any):
+        """Remember how many tokens a completion used for its max_tokens budget"""
+        usage = getattr(response, 'usage', None)
+        tokens = getattr(usage, 'completion_tokens', None)
+        if isinstance(tokens, int):
+            with self._cache_lock:
+                samples = self._output_tokens.get(max_tokens)
+                if samples is None:
+                    samples = self._output_tokens[max_tokens] = deque(maxlen=_OUTPUT_SAMPLE_SIZE)
+                samples.append(tokens)
+    
+    def output_token_stats(self) -> Dict[int, Dict[str, int]]:
+        """
+        Summarise recent completion lengths to check max_tokens budgets
+        
+        Every generate_* method uses a distinct budget, so each key
+        identifies one kind of call.
+        
+        Returns:
+            Dict mapping max_tokens to {'count', 'p95', 'max'} completion tokens
+        """
+        with self._cache_lock:
+            snapshot = [(max_tokens, list(samples)) for max_tokens, samples in self._output_tokens.items()]
+        
+        stats = {}
+        for max_tokens, samples in snapshot:
+            ordered = sorted(samples)
+            if ordered:
+                stats[max_tokens] = {
+                    'count': len(ordered),
+                    'p95': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                    'max': ordered[-1]
+                }
+        return stats
+    
     def _call_groq(self, messages: List[Dict[str, str]], 
                    max_tokens: int = 1024,
-                   temperature: float = 0.7) -> str:
+                   temperature: float = 0.7,
+                   tier: str = "balanced",
+                   use_cache: bool = False) -> str:
         """
         Call Groq API with retry logic
         
@@ -46,6 +363,8 @@ class GroqAITutor:
             messages: List of message dicts with 'role' and 'content'
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature (0-2)
+            tier: Speed tier from self.model_tiers ('instant', 'balanced', ...)
+            use_cache: Serve identical requests from the in-process response cache
             
         Returns:
             AI response text
@@ -53,36 +372,201 @@ class GroqAITutor:
         Raises:
             RuntimeError: If all retry attempts fail
         """
+        model = self.model_tiers[tier]
+        
+        if not use_cache:
+            return self._request_groq(messages, max_tokens, temperature, model)
+        
+        digest = hashlib.blake2b(
+            json.dumps(messages, sort_keys=True).encode('utf-8'), digest_size=16
+        ).hexdigest()
+        key = (model, digest, max_tokens, round(temperature, 2))
+        
+        with self._cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                stored_at, content = cached
+                if time.monotonic() - stored_at < _RESPONSE_CACHE_TTL:
+                    self._response_cache.move_to_end(key)
+                    return content
+                del self._response_cache[key]
+        
+        # The request runs unlocked; concurrent misses may both call the API
+        content = self._request_groq(messages, max_tokens, temperature, model)
+        with self._cache_lock:
+            self._response_cache[key] = (time.monotonic(), content)
+            if len(self._response_cache) > _RESPONSE_CACHE_MAXSIZE:
+                self._response_cache.popitem(last=False)
+        return content
+    
+    def _request_groq(self, messages: List[Dict[str, str]],
+                      max_tokens: int,
+                      temperature: float,
+                      model: str,
+                      stream: bool = False) -> Any:
+        """
+        Send one chat completion request, retrying with exponential backoff
+        
+        Returns the response text, or the chunk iterator when stream=True
+        (only opening the stream is retried).
+        """
         for attempt in range(self.retry_attempts):
             try:
                 if self.log_calls:
-                    logger.info(f"🤖 Calling Groq API (attempt {attempt + 1}/{self.retry_attempts})")
+                    logger.info("🤖 Calling Groq API (attempt %d/%d)", attempt + 1, self.retry_attempts)
                 
                 response = self.client.chat.completions.create(
-                    model=self.model,
+                    model=model,
                     messages=messages,
                     max_tokens=max_tokens,
                     temperature=temperature,
-                    timeout=self.timeout
+                    timeout=self.timeout,
+                    stream=stream
                 )
                 
-                content = response.choices[0].message.content
+                if stream:
+                    return response
+                
+                self._record_output(max_tokens, response)
+                content = response.choices[0].message.content.strip()
+                
+                if self.log_calls and logger.isEnabledFor(logging.INFO):
+                    logger.info("✅ Groq API response received (%d chars)", len(content))
+                
+                return content
+                
+            except Exception as e:
+                logger.warning("⚠️ Groq API error (attempt %d): %s", attempt + 1, e)
+                
+                delay = _retry_delay(attempt, e)
+                if delay is None:
+                    raise RuntimeError(f"Groq API rejected the request: {e}") from e
                 
+                if attempt < self.retry_attempts - 1:
+                    time.sleep(delay)
+                else:
+                    logger.error("❌ Failed after %d attempts", self.retry_attempts)
+                    raise RuntimeError(f"Groq API failed after {self.retry_attempts} attempts: {e}")
+    
+    def _stream_groq(self, messages: List[Dict[str, str]],
+                     max_tokens: int = 1024,
+                     temperature: float = 0.7,
+                     tier: str = "balanced") -> Iterator[str]:
+        """
+        Stream a Groq completion as text chunks
+        
+        Leading whitespace of the reply is dropped, matching the stripping
+        applied to non-streamed responses.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0-2)
+            tier: Speed tier from self.model_tiers
+            
+        Yields:
+            Response text fragments as they arrive
+        """
+        stream = self._request_groq(messages, max_tokens, temperature,
+                                    self.model_tiers[tier], stream=True)
+        
+        total_chars = 0
+        started = False
+        for chunk in stream:
+            text = chunk.choices[0].delta.content or ""
+            if not started:
+                text = text.lstrip()
+                started = bool(text)
+            if text:
+                total_chars += len(text)
+                yield text
+        
+        if self.log_calls:
+            logger.info("✅ Groq API stream finished (%d chars)", total_chars)
+    
+    async def _acall_groq(self, messages: List[Dict[str, str]],
+                          max_tokens: int = 1024,
+                          temperature: float = 0.7,
+                          tier: str = "balanced") -> str:
+        """
+        Async counterpart of _call_groq using the AsyncGroq client
+        
+        Independent calls can be awaited together with asyncio.gather.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0-2)
+            tier: Speed tier from self.model_tiers
+            
+        Returns:
+            AI response text
+            
+        Raises:
+            RuntimeError: If all retry attempts fail
+        """
+        model = self.model_tiers[tier]
+        
+        for attempt in range(self.retry_attempts):
+            try:
                 if self.log_calls:
-                    logger.info(f"✅ Groq API response received ({len(content)} chars)")
+                    logger.info("🤖 Calling Groq API async (attempt %d/%d)", attempt + 1, self.retry_attempts)
+                
+                response = await self.aclient.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=self.timeout
+                )
+                
+                self._record_output(max_tokens, response)
+                content = response.choices[0].message.content.strip()
+                
+                if self.log_calls and logger.isEnabledFor(logging.INFO):
+                    logger.info("✅ Groq API response received (%d chars)", len(content))
                 
                 return content
                 
             except Exception as e:
-                logger.warning(f"⚠️ Groq API error (attempt {attempt + 1}): {e}")
+                logger.warning("⚠️ Groq API error (attempt %d): %s", attempt + 1, e)
+                
+                delay = _retry_delay(attempt, e)
+                if delay is None:
+                    raise RuntimeError(f"Groq API rejected the request: {e}") from e
                 
                 if attempt < self.retry_attempts - 1:
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    time.sleep(wait_time)
+                    await asyncio.sleep(delay)  # Frees the event loop while waiting
                 else:
-                    logger.error(f"❌ Failed after {self.retry_attempts} attempts")
+                    logger.error("❌ Failed after %d attempts", self.retry_attempts)
                     raise RuntimeError(f"Groq API failed after {self.retry_attempts} attempts: {e}")
     
+    def _immediate_feedback_request(self, 
+                                   is_correct: bool,
+                                   student_response: str,
+                                   correct_answer: str,
+                                   concept: str,
+                                   difficulty: str,
+                                   mastery_level: float,
+                                   time_spent: int,
+                                   estimated_time: int) -> Tuple[List[Dict[str, str]], int, float, str]:
+        """Build the generate_immediate_feedback chat request as (messages, max_tokens, temperature, tier)"""
+        messages = [
+            {"role": "system", "content": _FEEDBACK_SYSTEM},
+            {"role": "user", "content": _prompt_payload(
+                concept=concept,
+                mastery=f"{mastery_level:.1%}",
+                time_spent_s=time_spent,
+                expected_time_s=estimated_time,
+                difficulty=difficulty,
+                student_answer=student_response,
+                correct_answer=correct_answer,
+                is_correct=is_correct
+            )}
+        ]
+        
+        return messages, 128, 0.8, "instant"
+    
     def generate_immediate_feedback(self, 
                                    is_correct: bool,
                                    student_response: str,
@@ -108,37 +592,114 @@ class GroqAITutor:
         Returns:
             Personalized feedback message
         """
-        prompt = f"""You are a supportive and encouraging educational tutor. Generate personalized feedback for a student.
-
-Student Profile:
-- Concept: {concept}
-- Current Mastery Level: {mastery_level:.1%}
-- Time Spent: {time_spent} seconds (Expected: {estimated_time} seconds)
-
-Question Info:
-- Difficulty: {difficulty}
-- Student's Answer: {student_response}
-- Correct Answer: {correct_answer}
-- Result: {'CORRECT ✓' if is_correct else 'INCORRECT ✗'}
-
-Generate feedback that:
-1. Is encouraging and supportive (avoid discouraging language)
-2. Acknowledges effort regardless of correctness
-3. For correct answers: Praise the achievement and suggest next steps
-4. For incorrect answers: Explain why the answer is wrong and provide guidance
-5. Is concise (2-3 sentences)
-6. Includes a specific learning suggestion
-
-Keep tone positive and motivating."""
-
+        request = self._immediate_feedback_request(
+            is_correct, student_response, correct_answer, concept, difficulty,
+            mastery_level, time_spent, estimated_time
+        )
+        return self._call_groq(*request)
+    
+    async def agenerate_immediate_feedback(self, 
+                                          is_correct: bool,
+                                          student_response: str,
+                                          correct_answer: str,
+                                          concept: str,
+                                          difficulty: str,
+                                          mastery_level: float,
+                                          time_spent: int,
+                                          estimated_time: int) -> str:
+        """Async variant of generate_immediate_feedback (see there for arguments)"""
+        request = self._immediate_feedback_request(
+            is_correct, student_response, correct_answer, concept, difficulty,
+            mastery_level, time_spent, estimated_time
+        )
+        return await self._acall_groq(*request)
+    
+    def generate_immediate_feedback_stream(self, 
+                                          is_correct: bool,
+                                          student_response: str,
+                                          correct_answer: str,
+                                          concept: str,
+                                          difficulty: str,
+                                          mastery_level: float,
+                                          time_spent: int,
+                                          estimated_time: int) -> Iterator[str]:
+        """Streaming variant of generate_immediate_feedback: yields the reply as it is generated"""
+        request = self._immediate_feedback_request(
+            is_correct, student_response, correct_answer, concept, difficulty,
+            mastery_level, time_spent, estimated_time
+        )
+        yield from self._stream_groq(*request)
+    
+    def generate_immediate_feedback_batch(self,
+                                          items: List[Dict[str, Any]]) -> List[str]:
+        """
+        Generate immediate feedback for several answers with one API call
+        
+        Args:
+            items: List of dicts holding the generate_immediate_feedback
+                arguments (is_correct, student_response, correct_answer,
+                concept, difficulty, mastery_level, time_spent, estimated_time)
+            
+        Returns:
+            Feedback messages in the same order as items
+            
+        Raises:
+            ValueError: If the response is not a JSON array with one string per item
+        """
+        if not items:
+            return []
+        
+        answers = [
+            {
+                'concept': item['concept'],
+                'mastery': f"{item['mastery_level']:.1%}",
+                'time_spent_s': item['time_spent'],
+                'expected_time_s': item['estimated_time'],
+                'difficulty': item['difficulty'],
+                'student_answer': item['student_response'],
+                'correct_answer': item['correct_answer'],
+                'is_correct': item['is_correct']
+            }
+            for item in items
+        ]
+        
         messages = [
-            {"role": "system", "content": "You are an expert, supportive educational tutor."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": _FEEDBACK_BATCH_SYSTEM},
+            {"role": "user", "content": _json_dumps(answers)}
         ]
         
-        feedback = self._call_groq(messages, max_tokens=256, temperature=0.8)
+        response = self._call_groq(messages, max_tokens=128 * len(items), temperature=0.8,
+                                   tier="instant")
+        feedback = _parse_json_reply(response)
+        
+        if (not isinstance(feedback, list) or len(feedback) != len(items)
+                or not all(isinstance(f, str) for f in feedback)):
+            raise ValueError(
+                f"Expected a JSON array of {len(items)} feedback strings"
+            )
         
-        return feedback.strip()
+        return [f.strip() for f in feedback]
+    
+    def _hint_request(self, 
+                     concept: str,
+                     question: str,
+                     student_attempt: str,
+                     hint_level: int = 1,
+                     attempt_number: int = 1) -> Tuple[List[Dict[str, str]], int, float, str]:
+        """Build the generate_hint chat request as (messages, max_tokens, temperature, tier)"""
+        messages = [
+            {"role": "system", "content": _HINT_SYSTEM},
+            {"role": "user", "content": _prompt_payload(
+                concept=concept,
+                question=question,
+                student_attempt=student_attempt,
+                attempt_number=attempt_number,
+                hint_level=hint_level,
+                hint_style=_HINT_STYLES.get(hint_level, _HINT_STYLES[1])
+            )}
+        ]
+        
+        return messages, 96, 0.7, "instant"
     
     def generate_hint(self, 
                      concept: str,
@@ -157,45 +718,58 @@ Keep tone positive and motivating."""
             attempt_number: Which attempt is this
             
         Returns:
-            Helpful hint text
+            Hint text only. Earlier versions prefixed it with '💭 Hint n:';
+            callers that display the hint must now add that heading with
+            format_hint (PersonalizedTutorAgent.generate_hint does)
         """
-        hint_descriptions = {
-            1: "a very subtle hint that points in the right direction without giving away the answer",
-            2: "a more direct hint that explains what approach to use",
-            3: "a detailed explanation of the solution approach"
-        }
-        
-        level_desc = hint_descriptions.get(hint_level, hint_descriptions[1])
-        
-        prompt = f"""You are an educational tutor providing progressive hints to a student.
-
-Concept: {concept}
-Question: {question}
-Student's Attempt: {student_attempt}
-Attempt Number: {attempt_number}
-Hint Level: {hint_level} (on scale of 1-3, where 1 is minimal and 3 is detailed)
-
-Provide {level_desc} for this student.
-
-Requirements:
-- Do NOT give away the complete answer
-- Focus on the learning process, not just the solution
-- Be encouraging
-- Keep hint concise (1-2 sentences)"""
-
-        messages = [
-            {"role": "system", "content": "You are an expert educational tutor skilled at providing progressive hints."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        hint = self._call_groq(messages, max_tokens=200, temperature=0.7)
+        request = self._hint_request(
+            concept, question, student_attempt, hint_level, attempt_number
+        )
+        return self._call_groq(*request)
+    
+    @staticmethod
+    def format_hint(hint: str, hint_level: int) -> str:
+        """
+        Add the display heading to a hint from generate_hint
         
-        return f"💭 Hint {hint_level}: {hint.strip()}"
+        Args:
+            hint: Raw hint text
+            hint_level: Level the hint was generated at
+            
+        Returns:
+            Hint text prefixed with its level
+        """
+        return f"💭 Hint {hint_level}: {hint}"
+    
+    async def agenerate_hint(self, 
+                            concept: str,
+                            question: str,
+                            student_attempt: str,
+                            hint_level: int = 1,
+                            attempt_number: int = 1) -> str:
+        """Async variant of generate_hint (see there for arguments)"""
+        request = self._hint_request(
+            concept, question, student_attempt, hint_level, attempt_number
+        )
+        return await self._acall_groq(*request)
+    
+    def generate_hint_stream(self, 
+                            concept: str,
+                            question: str,
+                            student_attempt: str,
+                            hint_level: int = 1,
+                            attempt_number: int = 1) -> Iterator[str]:
+        """Streaming variant of generate_hint: yields the reply (no heading) as it is generated"""
+        request = self._hint_request(
+            concept, question, student_attempt, hint_level, attempt_number
+        )
+        yield from self._stream_groq(*request)
     
     def generate_explanation(self, 
                            concept: str,
                            context: Optional[str] = None,
-                           detail_level: str = 'basic') -> str:
+                           detail_level: str = 'basic',
+                           use_cache: bool = True) -> str:
         """
         Generate concept explanation
         
@@ -203,42 +777,73 @@ Requirements:
             concept: Concept to explain
             context: Additional context about the student's question
             detail_level: 'basic', 'intermediate', or 'advanced'
+            use_cache: Reuse an earlier identical explanation (sampled at temperature 0)
             
         Returns:
             Concept explanation
         """
-        detail_prompts = {
-            'basic': 'Provide a clear, simple explanation suitable for a beginner.',
-            'intermediate': 'Provide a moderate-depth explanation with key concepts and connections.',
-            'advanced': 'Provide a detailed explanation including advanced applications and implications.'
+        if use_cache:
+            key = (concept, detail_level, context or '')
+            with self._cache_lock:
+                cached = self._explanation_cache.get(key)
+                if cached is not None:
+                    self._explanation_cache.move_to_end(key)
+                    return cached
+        
+        fields = {
+            'concept': concept,
+            'depth': _DETAIL_PROMPTS.get(detail_level, _DETAIL_PROMPTS['basic'])
         }
+        if context:
+            fields['student_question'] = context
         
-        detail_prompt = detail_prompts.get(detail_level, detail_prompts['basic'])
+        messages = [
+            {"role": "system", "content": _EXPLANATION_SYSTEM},
+            {"role": "user", "content": _prompt_payload(**fields)}
+        ]
         
-        context_str = f"\nStudent's Question: {context}" if context else ""
+        # Deterministic sampling makes the explanation safe to cache; the
+        # cache above already covers exact repeats, so skip _response_cache
+        temperature = 0.0 if use_cache else 0.7
+        explanation = self._call_groq(messages, max_tokens=320, temperature=temperature,
+                                      tier="balanced")
         
-        prompt = f"""You are an expert educator explaining concepts clearly.
-
-Concept to Explain: {concept}{context_str}
-
-{detail_prompt}
-
-Format your response as:
-1. Definition (1 sentence)
-2. Key Points (2-3 bullets)
-3. Example (practical application)
-4. Connection to Learning (how to remember it)
-
-Keep the explanation engaging and easy to understand."""
-
+        if use_cache:
+            self._remember_explanation(key, explanation)
+        
+        return explanation
+    
+    def _remember_explanation(self, key: Tuple[str, str, str], explanation: str):
+        """Store an explanation in the exact-match cache, evicting the least recently used"""
+        with self._cache_lock:
+            self._explanation_cache[key] = explanation
+            if len(self._explanation_cache) > _EXPLANATION_CACHE_MAXSIZE:
+                self._explanation_cache.popitem(last=False)
+    
+    def clear_explanation_cache(self):
+        """Forget every cached explanation, e.g. after prompts or course content change"""
+        with self._cache_lock:
+            self._explanation_cache.clear()
+    
+    def _next_steps_request(self,
+                          concept: str,
+                          mastery_level: float,
+                          weak_areas: List[str],
+                          available_concepts: List[str],
+                          total_questions: int) -> Tuple[List[Dict[str, str]], int, float, str]:
+        """Build the generate_next_steps chat request as (messages, max_tokens, temperature, tier)"""
         messages = [
-            {"role": "system", "content": "You are an expert educator skilled at explaining complex concepts clearly."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": _NEXT_STEPS_SYSTEM},
+            {"role": "user", "content": _prompt_payload(
+                current_concept=concept,
+                mastery=f"{mastery_level:.1%}",
+                questions_completed=total_questions,
+                weak_areas=weak_areas or 'None identified',
+                available_next_concepts=available_concepts or 'None available'
+            )}
         ]
         
-        explanation = self._call_groq(messages, max_tokens=512, temperature=0.7)
-        
-        return explanation.strip()
+        return messages, 256, 0.7, "balanced"
     
     def generate_next_steps(self,
                           concept: str,
@@ -259,40 +864,47 @@ Keep the explanation engaging and easy to understand."""
         Returns:
             Personalized next steps recommendation
         """
-        weak_str = ', '.join(weak_areas) if weak_areas else 'None identified'
-        available_str = ', '.join(available_concepts) if available_concepts else 'None available'
+        request = self._next_steps_request(
+            concept, mastery_level, weak_areas, available_concepts,
+            total_questions
+        )
+        return self._call_groq(*request)
+    
+    async def agenerate_next_steps(self,
+                                 concept: str,
+                                 mastery_level: float,
+                                 weak_areas: List[str],
+                                 available_concepts: List[str],
+                                 total_questions: int) -> str:
+        """Async variant of generate_next_steps (see there for arguments)"""
+        request = self._next_steps_request(
+            concept, mastery_level, weak_areas, available_concepts,
+            total_questions
+        )
+        return await self._acall_groq(*request)
+    
+    def _motivational_message_request(self,
+                                     mastery_level: float,
+                                     total_questions: int,
+                                     accuracy: float,
+                                     streak: int = 0,
+                                     recent_performance: Optional[str] = None) -> Tuple[List[Dict[str, str]], int, float, str]:
+        """Build the generate_motivational_message chat request as (messages, max_tokens, temperature, tier)"""
+        fields = {
+            'mastery': f"{mastery_level:.1%}",
+            'questions_completed': total_questions,
+            'accuracy': f"{accuracy:.1%}",
+            'correct_streak': streak
+        }
+        if recent_performance:
+            fields['recent_performance'] = recent_performance
         
-        prompt = f"""You are a personalized learning advisor. Create a specific learning path recommendation.
-
-Current Status:
-- Current Concept: {concept}
-- Mastery Level: {mastery_level:.1%}
-- Questions Completed: {total_questions}
-- Weak Areas: {weak_str}
-- Available Next Concepts: {available_str}
-
-Provide a personalized recommendation that:
-1. Advises whether to continue or move forward based on mastery level
-2. Suggests specific next steps (e.g., more practice, review, or new concept)
-3. Addresses weak areas strategically
-4. Encourages the student
-
-Format as:
-📚 Your Personalized Learning Path:
-1. [Next action with reasoning]
-2. [Step after that]
-3. [Long-term suggestion]
-
-Be specific and actionable."""
-
         messages = [
-            {"role": "system", "content": "You are an expert learning advisor creating personalized educational paths."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": _MOTIVATION_SYSTEM},
+            {"role": "user", "content": _prompt_payload(**fields)}
         ]
         
-        recommendation = self._call_groq(messages, max_tokens=400, temperature=0.7)
-        
-        return recommendation.strip()
+        return messages, 160, 0.9, "instant"
     
     def generate_motivational_message(self,
                                      mastery_level: float,
@@ -313,38 +925,40 @@ Be specific and actionable."""
         Returns:
             Motivational message
         """
-        performance_context = f"\nRecent Performance: {recent_performance}" if recent_performance else ""
-        
-        prompt = f"""You are an encouraging educational coach. Create a motivational message for a student.
-
-Progress Metrics:
-- Overall Mastery Level: {mastery_level:.1%}
-- Questions Completed: {total_questions}
-- Overall Accuracy: {accuracy:.1%}
-- Current Streak: {streak} correct answers{performance_context}
-
-Create a motivational message that:
-1. Celebrates their achievements specifically (use the metrics)
-2. Recognizes effort and progress
-3. Provides encouragement for next steps
-4. Sets a positive, achievable outlook
-5. Is personal and genuine (not generic)
-
-Include emoji where appropriate for engagement. Keep it concise but impactful."""
-
-        messages = [
-            {"role": "system", "content": "You are an enthusiastic and genuine educational coach who motivates students effectively."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        message = self._call_groq(messages, max_tokens=300, temperature=0.9)
-        
-        return message.strip()
+        request = self._motivational_message_request(
+            mastery_level, total_questions, accuracy, streak, recent_performance
+        )
+        return self._call_groq(*request)
+    
+    async def agenerate_motivational_message(self,
+                                            mastery_level: float,
+                                            total_questions: int,
+                                            accuracy: float,
+                                            streak: int = 0,
+                                            recent_performance: Optional[str] = None) -> str:
+        """Async variant of generate_motivational_message (see there for arguments)"""
+        request = self._motivational_message_request(
+            mastery_level, total_questions, accuracy, streak, recent_performance
+        )
+        return await self._acall_groq(*request)
+    
+    def generate_motivational_message_stream(self,
+                                            mastery_level: float,
+                                            total_questions: int,
+                                            accuracy: float,
+                                            streak: int = 0,
+                                            recent_performance: Optional[str] = None) -> Iterator[str]:
+        """Streaming variant of generate_motivational_message: yields the reply as it is generated"""
+        request = self._motivational_message_request(
+            mastery_level, total_questions, accuracy, streak, recent_performance
+        )
+        yield from self._stream_groq(*request)
     
     def analyze_error_pattern(self,
                              concept: str,
                              errors: List[str],
-                             mastery_level: float) -> str:
+                             mastery_level: float,
+                             use_cache: bool = True) -> str:
         """
         Analyze common error patterns
         
@@ -352,46 +966,31 @@ Include emoji where appropriate for engagement. Keep it concise but impactful.""
             concept: Concept where errors occurred
             errors: List of common errors
             mastery_level: Current mastery level
+            use_cache: Reuse an earlier analysis of the same errors at the same
+                mastery (sampled at temperature 0)
             
         Returns:
             Error analysis and recommendations
         """
-        errors_str = '\n'.join([f"- {error}" for error in errors[:5]])
-        
-        prompt = f"""You are an expert educational analyst. Analyze error patterns and provide insights.
-
-Concept: {concept}
-Student's Mastery Level: {mastery_level:.1%}
-
-Common Errors Made:
-{errors_str}
-
-Provide:
-1. Root cause analysis (why these errors occur)
-2. 2-3 specific misconceptions to address
-3. Targeted practice recommendations
-4. Preventive strategies for the future
-
-Format as:
-📊 Error Analysis:
-🎯 Root Cause: [...]
-❌ Common Misconceptions: [...]
-📋 Recommended Practice: [...]
-✨ Prevention Tips: [...]"""
-
         messages = [
-            {"role": "system", "content": "You are an expert educational psychologist analyzing learning errors."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": _ERROR_PATTERN_SYSTEM},
+            {"role": "user", "content": _prompt_payload(
+                concept=concept,
+                mastery=f"{mastery_level:.1%}",
+                common_errors=errors[:5]
+            )}
         ]
         
-        analysis = self._call_groq(messages, max_tokens=500, temperature=0.7)
-        
-        return analysis.strip()
+        # Only a deterministic sample is safe to hand to a later request
+        temperature = 0.0 if use_cache else 0.7
+        return self._call_groq(messages, max_tokens=384, temperature=temperature,
+                               tier="balanced", use_cache=use_cache)
     
     def generate_quiz_question(self, 
                              concept: str,
                              difficulty: str = "Medium",
-                             mastery_level: float = 0.5) -> Dict[str, Any]:
+                             mastery_level: float = 0.5,
+                             use_cache: bool = False) -> Dict[str, Any]:
         """
         Generate an AI-created quiz question with correct answer
         
@@ -399,98 +998,102 @@ Format as:
             concept: Concept to create question for
             difficulty: Easy/Medium/Hard
             mastery_level: Student's current mastery level (0-1)
+            use_cache: Reuse an earlier identical question (sampled at temperature 0)
+                instead of asking for a fresh, varied one
             
         Returns:
             Dict with 'question', 'options', 'correct_answer', 'explanation'
         """
-        import random
-        import time
-        import json
+        if not use_cache:
+            with self._cache_lock:
+                future = self._prefetch_cache.pop(
+                    self._prefetch_key(concept, difficulty, mastery_level), None
+                )
+            # A prefetch still queued is dropped and generated live; once it
+            # is running it cannot be cancelled, and finishing it is quicker
+            # than starting a second request
+            if future is not None and not future.cancel():
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning("⚠️ Prefetched question failed, generating live: %s", e)
         
+        return self._generate_quiz_question(concept, difficulty, mastery_level, use_cache)
+    
+    @staticmethod
+    def _prefetch_key(concept: str, difficulty: str, mastery_level: float) -> Tuple[str, str, str]:
+        """Prefetch cache key: mastery at the precision the prompt shows it"""
+        return concept, difficulty, f"{mastery_level:.1%}"
+    
+    def prefetch_next_question(self,
+                               concept: str,
+                               difficulty: str = "Medium",
+                               mastery_level: float = 0.5) -> Future:
+        """
+        Start generating a quiz question in the background
+        
+        The next generate_quiz_question call for the same concept,
+        difficulty and mastery (to the 0.1% shown in the prompt) returns it,
+        so generation overlaps the time the student spends on the current
+        question. Calls with another mastery level ignore the prefetch.
+        
+        Args:
+            concept: Concept the next question is likely to cover
+            difficulty: Easy/Medium/Hard
+            mastery_level: Student's current mastery level (0-1)
+            
+        Returns:
+            Future resolving to the question dict
+        """
+        # Keep one prefetch per concept and difficulty, so ones made for a
+        # mastery nobody asks for again do not pile up (cancel() only stops
+        # a replaced prefetch that has not started yet)
+        with self._cache_lock:
+            for key in [k for k in self._prefetch_cache if k[:2] == (concept, difficulty)]:
+                self._prefetch_cache.pop(key).cancel()
+            
+            future = _POOL.submit(self._generate_quiz_question, concept, difficulty,
+                                  mastery_level, False)
+            self._prefetch_cache[self._prefetch_key(concept, difficulty, mastery_level)] = future
+        return future
+    
+    def _generate_quiz_question(self,
+                                concept: str,
+                                difficulty: str,
+                                mastery_level: float,
+                                use_cache: bool) -> Dict[str, Any]:
+        """Generate a quiz question with the API (see generate_quiz_question)"""
         # Add randomization to ensure variety
         random_seed = int(time.time() * 1000) % 10000
         random.seed(random_seed)
         
-        # Define different question types for variety
-        question_types = [
-            "conceptual understanding",
-            "practical application",
-            "problem-solving scenario",
-            "definition and terminology",
-            "comparative analysis",
-            "real-world use case"
-        ]
+        selected_type = random.choice(_QUESTION_TYPES)
         
-        selected_type = random.choice(question_types)
-        
-        prompt = f"""You are an expert teacher creating UNIQUE quiz questions.
-
-Generate a {difficulty.lower()} quiz question about: {concept}
-Question Type: {selected_type}
-Student's Mastery Level: {mastery_level:.1%}
-
-IMPORTANT REQUIREMENTS:
-1. Create a COMPLETELY DIFFERENT question each time (vary question structure, examples, and angles)
-2. Make it appropriate for the mastery level and difficulty
-3. Focus on {selected_type}
-4. Use specific, contextual examples
-5. Avoid generic or repetitive questions
-
-Return ONLY valid JSON (no markdown, no extra text):
-{{
-    "question": "Clear, concise, specific question text about {concept}",
-    "options": [
-        "First plausible option",
-        "Second plausible option",
-        "Third plausible option",
-        "Fourth plausible option"
-    ],
-    "correct_answer": "The correct option (must be one of the four options above)",
-    "correct_index": 0,
-    "explanation": "Why this answer is correct and educational insights"
-}}
-
-Requirements:
-1. question: Clear, specific, and varied (not generic)
-2. options: All plausible, contextually relevant, only one correct
-3. correct_answer: Exact match to one option
-4. correct_index: 0-3 position of correct answer in options list
-5. explanation: Educational value explaining why answer is correct"""
-
         messages = [
-            {"role": "system", "content": "You are an expert educator creating unique, varied quiz questions. Always return valid JSON. Create different questions each time - vary the question type, examples, and approach."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": _QUIZ_SYSTEM},
+            {"role": "user", "content": _prompt_payload(
+                concept=concept,
+                difficulty=difficulty.lower(),
+                question_type=selected_type,
+                mastery=f"{mastery_level:.1%}"
+            )}
         ]
         
         try:
-            # Use higher temperature for more creativity and variety
-            response = self._call_groq(messages, max_tokens=800, temperature=1.2)
+            # Use higher temperature for more creativity and variety,
+            # unless the caller asked for a reproducible (cacheable) question
+            temperature = 0.0 if use_cache else 1.2
+            response = self._call_groq(messages, max_tokens=512, temperature=temperature,
+                                       tier="balanced", use_cache=use_cache)
             
             # Parse JSON response
             # Clean up response (remove markdown if present)
-            cleaned = response.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:]
-            if cleaned.startswith("```"):
-                cleaned = cleaned[3:]
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
+            question_data = _parse_json_reply(response)
             
-            question_data = json.loads(cleaned.strip())
-            
-            # Validate structure
-            required_keys = ['question', 'options', 'correct_answer', 'correct_index', 'explanation']
-            if not all(key in question_data for key in required_keys):
-                raise ValueError(f"Missing required keys in response")
-            
-            # Validate correct_index
-            if not isinstance(question_data['correct_index'], int) or question_data['correct_index'] < 0 or question_data['correct_index'] > 3:
-                question_data['correct_index'] = 0
-            
-            return question_data
+            return _validate_question(question_data)
             
         except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse JSON response: {e}")
+            logger.warning("Failed to parse JSON response: %s", e)
             # Return diverse fallback questions based on question type
             fallback_questions = [
                 {
@@ -545,7 +1148,7 @@ Requirements:
             
             return random.choice(fallback_questions)
         except Exception as e:
-            logger.error(f"Error generating question: {e}")
+            logger.error("Error generating question: %s", e)
             # Return diverse fallback questions
             fallback_questions = [
                 {
@@ -587,3 +1190,55 @@ Requirements:
             ]
             
             return random.choice(fallback_questions)
+    
+    def generate_quiz_questions_batch(self,
+                                      concept: str,
+                                      difficulty: str = "Medium",
+                                      mastery_level: float = 0.5,
+                                      n: int = 5) -> List[Dict[str, Any]]:
+        """
+        Generate several quiz questions with a single API call
+        Falls back to one generate_quiz_question call per question when the
+        batched response is not a valid array of n questions
+        
+        Args:
+            concept: Concept to create questions for
+            difficulty: Easy/Medium/Hard
+            mastery_level: Student's current mastery level (0-1)
+            n: Number of questions
+            
+        Returns:
+            List of n dicts with 'question', 'options', 'correct_answer',
+            'correct_index', 'explanation'
+        """
+        if n <= 0:
+            return []
+        
+        # One question type per question, shuffled and repeated as needed
+        types = random.sample(_QUESTION_TYPES, len(_QUESTION_TYPES))
+        messages = [
+            {"role": "system", "content": _QUIZ_BATCH_SYSTEM},
+            {"role": "user", "content": _prompt_payload(
+                concept=concept,
+                difficulty=difficulty.lower(),
+                mastery=f"{mastery_level:.1%}",
+                question_types=[types[i % len(types)] for i in range(n)]
+            )}
+        ]
+        
+        try:
+            response = self._call_groq(messages, max_tokens=512 * n, temperature=1.2,
+                                       tier="balanced")
+            questions = _parse_json_reply(response)
+            
+            if not isinstance(questions, list) or len(questions) != n:
+                raise ValueError(f"Expected a JSON array of {n} questions")
+            
+            return [_validate_question(question) for question in questions]
+            
+        except Exception as e:
+            logger.warning("Batched question generation failed (%s); generating one by one", e)
+            return [
+                self._generate_quiz_question(concept, difficulty, mastery_level, False)
+                for _ in range(n)
+            ]
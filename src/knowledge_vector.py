@@ -0,0 +1,82 @@
+"""
+Knowledge Vector
+Array-backed knowledge state shared by learner profiles and knowledge tracing
+"""
+
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class KnowledgeVector(Mapping):
+    """
+    Mastery per concept, stored as one float64 array
+    
+    Behaves as a mapping from (string) concept name to mastery, so code
+    written against the old knowledge dicts keeps working, while array
+    consumers use .array directly. Items can also be read by position;
+    existing concepts can be reassigned but none can be added.
+    """
+    
+    __slots__ = ('concepts', 'array', '_index')
+    
+    def __init__(self, concepts: List[str], array: np.ndarray,
+                 index: Optional[Dict[str, int]] = None):
+        """
+        Initialize knowledge vector
+        
+        Args:
+            concepts: Concept names, ordering the array
+            array: Mastery of each concept
+            index: Concept -> position map matching concepts, if the caller
+                already has one
+        """
+        self.concepts = concepts
+        self.array = np.asarray(array, dtype=np.float64)
+        self._index = index if index is not None else {
+            concept: i for i, concept in enumerate(concepts)
+        }
+    
+    @classmethod
+    def from_dict(cls, knowledge: Dict[str, float]) -> 'KnowledgeVector':
+        """Build a vector from a concept -> mastery mapping"""
+        concepts = list(knowledge)
+        return cls(concepts, np.fromiter(knowledge.values(), dtype=np.float64,
+                                         count=len(concepts)))
+    
+    def index_of(self, concept: str) -> int:
+        """Array position of a concept (KeyError if unknown)"""
+        i = self._index[concept]
+        if i >= len(self.array):
+            raise KeyError(concept)
+        return i
+    
+    def __getitem__(self, key) -> float:
+        if isinstance(key, (int, np.integer)):
+            return float(self.array[key])
+        return float(self.array[self.index_of(key)])
+    
+    def __setitem__(self, concept: str, mastery: float):
+        self.array[self.index_of(concept)] = mastery
+    
+    def __iter__(self):
+        return iter(self.concepts)
+    
+    def __len__(self) -> int:
+        return len(self.concepts)
+    
+    def __contains__(self, concept) -> bool:
+        i = self._index.get(concept)
+        return i is not None and i < len(self.array)
+    
+    def __repr__(self) -> str:
+        return f"KnowledgeVector({self.to_dict()!r})"
+    
+    def copy(self) -> 'KnowledgeVector':
+        """Independent copy sharing the concept list and index"""
+        return KnowledgeVector(self.concepts, self.array.copy(), self._index)
+    
+    def to_dict(self) -> Dict[str, float]:
+        """Plain dict view, for serialization boundaries"""
+        return dict(zip(self.concepts, self.array.tolist()))
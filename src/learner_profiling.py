@@ -5,8 +5,82 @@ Tracks student performance and maintains learner knowledge state vector
 
 import pandas as pd
 import numpy as np
-from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple
+from src.knowledge_vector import KnowledgeVector
+
+_DIFFICULTY_SCORES = {'Easy': 1, 'Medium': 2, 'Hard': 3}
+
+
+def encode_difficulty(difficulty: pd.Series) -> np.ndarray:
+    """
+    Encode a difficulty column once for update_with_interaction(difficulty_int=...)
+    
+    Args:
+        difficulty: Difficulty labels (Easy/Medium/Hard)
+        
+    Returns:
+        int8 array of difficulty scores (unknown labels count as Medium)
+    """
+    return difficulty.map(_DIFFICULTY_SCORES).fillna(2).to_numpy().astype(np.int8)
+
+
+_METRIC_COLUMNS = ('attempts', 'correct', 'incorrect', 'total_time',
+                   'avg_difficulty_faced', 'streak')
+
+
+def _mastery(attempts: np.ndarray, correct: np.ndarray, streak: np.ndarray) -> np.ndarray:
+    """LearnerProfile.calculate_mastery_probability over metric arrays"""
+    accuracy = correct / np.maximum(attempts, 1)
+    streak_bonus = np.minimum(0.1, streak * 0.05)
+    effort_weight = np.minimum(1.0, attempts / 10.0) * 0.1
+    
+    mastery = np.clip(accuracy + streak_bonus + effort_weight, 0.0, 1.0)
+    return np.where(attempts > 0, mastery, 0.0)
+
+
+def _stack_metrics(profiles: List['LearnerProfile']) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Concatenate the metric arrays of several profiles
+    
+    Returns:
+        Tuple of (concept of each row, metric columns plus mastery, which is
+        NaN for concepts outside each profile's concept list)
+    """
+    concepts = [concept for profile in profiles for concept in profile._concept_index]
+    columns = {
+        name: np.concatenate([getattr(profile, name) for profile in profiles])
+        for name in _METRIC_COLUMNS
+    }
+    tracked = np.concatenate([
+        np.arange(len(profile.attempts)) < len(profile.concepts) for profile in profiles
+    ])
+    mastery = _mastery(columns['attempts'], columns['correct'], columns['streak'])
+    columns['mastery'] = np.where(tracked, mastery, np.nan)
+    return concepts, columns
+
+
+def _select_concepts(knowledge: Mapping[str, float], mask_fn, n: int,
+                     largest: bool) -> List[str]:
+    """
+    Concepts passing mask_fn, ordered by mastery, first n
+    
+    Matches a stable sort-then-slice (ties keep knowledge order), but only
+    the n best candidates are sorted: np.partition finds the cut-off first.
+    """
+    if not isinstance(knowledge, KnowledgeVector):
+        knowledge = KnowledgeVector.from_dict(knowledge)
+    names, values = knowledge.concepts, knowledge.array
+    idx = np.flatnonzero(mask_fn(values))
+    key = -values[idx] if largest else values[idx]
+    
+    if 0 < n < len(idx):
+        # Keep everything tied with the n-th candidate so ties resolve by order
+        cutoff = np.partition(key, n - 1)[n - 1]
+        keep = key <= cutoff
+        idx, key = idx[keep], key[keep]
+    
+    order = idx[np.argsort(key, kind='stable')]
+    return [names[i] for i in order.tolist()][:n]
 
 
 class LearnerProfile:
@@ -23,16 +97,18 @@ class LearnerProfile:
         self.student_id = student_id
         self.concepts = concepts
         
-        # Performance metrics per concept
-        self.concept_metrics = defaultdict(lambda: {
-            'attempts': 0,
-            'correct': 0,
-            'incorrect': 0,
-            'total_time': 0,
-            'avg_difficulty_faced': 0.0,
-            'last_attempt_timestamp': None,
-            'streak': 0  # Consecutive correct answers
-        })
+        # Performance metrics per concept, as parallel arrays indexed by
+        # _concept_index (concepts outside self.concepts are appended on
+        # first use)
+        self._concept_index = {concept: i for i, concept in enumerate(concepts)}
+        n_concepts = len(self._concept_index)
+        self.attempts = np.zeros(n_concepts, dtype=np.int64)
+        self.correct = np.zeros(n_concepts, dtype=np.int64)
+        self.incorrect = np.zeros(n_concepts, dtype=np.int64)
+        self.total_time = np.zeros(n_concepts, dtype=np.float64)
+        self.avg_difficulty_faced = np.zeros(n_concepts, dtype=np.float64)
+        self.streak = np.zeros(n_concepts, dtype=np.int64)  # Consecutive correct answers
+        self.last_attempt_timestamp = [None] * n_concepts
         
         # Overall learner metrics
         self.overall_metrics = {
@@ -44,11 +120,47 @@ class LearnerProfile:
             'learning_velocity': 0.0
         }
         
-        # Knowledge state vector (mastery probability per concept)
-        self.knowledge_state = {concept: 0.0 for concept in concepts}
-        
+        # Knowledge state vector (mastery probability per concept), recomputed
+        # only after the metrics change
+        self.knowledge_state = KnowledgeVector(
+            concepts, np.zeros(len(concepts)), self._concept_index
+        )
+        self._knowledge_dirty = True
+    
+    def _concept_slot(self, concept: str) -> int:
+        """Array index of a concept's metrics, adding a slot for unseen concepts"""
+        index = self._concept_index.get(concept)
+        if index is None:
+            index = self._concept_index[concept] = len(self.attempts)
+            self.attempts = np.append(self.attempts, 0)
+            self.correct = np.append(self.correct, 0)
+            self.incorrect = np.append(self.incorrect, 0)
+            self.total_time = np.append(self.total_time, 0.0)
+            self.avg_difficulty_faced = np.append(self.avg_difficulty_faced, 0.0)
+            self.streak = np.append(self.streak, 0)
+            self.last_attempt_timestamp.append(None)
+        return index
+    
+    @property
+    def concept_metrics(self) -> Dict[str, Dict]:
+        """Metrics of every attempted concept as a dict per concept"""
+        return {
+            concept: {
+                'attempts': int(self.attempts[i]),
+                'correct': int(self.correct[i]),
+                'incorrect': int(self.incorrect[i]),
+                'total_time': float(self.total_time[i]),
+                'avg_difficulty_faced': float(self.avg_difficulty_faced[i]),
+                'last_attempt_timestamp': self.last_attempt_timestamp[i],
+                'streak': int(self.streak[i])
+            }
+            for concept, i in self._concept_index.items()
+            if self.attempts[i] > 0
+        }
+    
     def update_with_interaction(self, concept: str, correct: int, 
-                               time_spent: int, difficulty: str, timestamp=None):
+                               time_spent: int, difficulty: Optional[str] = None,
+                               timestamp=None, difficulty_int: Optional[int] = None):
         """
         Update profile with new interaction
         
@@ -58,29 +170,35 @@ class LearnerProfile:
             time_spent: Time spent in seconds
             difficulty: Difficulty level (Easy/Medium/Hard)
             timestamp: Timestamp of interaction
+            difficulty_int: Pre-encoded difficulty score (1-3, see
+                encode_difficulty); takes precedence over difficulty
         """
-        metrics = self.concept_metrics[concept]
+        i = self._concept_slot(concept)
         
         # Update attempt counts
-        metrics['attempts'] += 1
-        metrics['correct'] += correct
-        metrics['incorrect'] += 1 - correct
-        metrics['total_time'] += time_spent
-        metrics['last_attempt_timestamp'] = timestamp
+        attempts = self.attempts[i] + 1
+        self.attempts[i] = attempts
+        self.correct[i] += correct
+        self.incorrect[i] += 1 - correct
+        self.total_time[i] += time_spent
+        self.last_attempt_timestamp[i] = timestamp
         
         # Update streak
         if correct:
-            metrics['streak'] += 1
+            self.streak[i] += 1
         else:
-            metrics['streak'] = 0
+            self.streak[i] = 0
         
         # Track difficulty progression
-        difficulty_map = {'Easy': 1, 'Medium': 2, 'Hard': 3}
-        diff_score = difficulty_map.get(difficulty, 2)
-        metrics['avg_difficulty_faced'] = (
-            (metrics['avg_difficulty_faced'] * (metrics['attempts'] - 1) + diff_score) / 
-            metrics['attempts']
+        if difficulty_int is None:
+            diff_score = _DIFFICULTY_SCORES.get(difficulty, 2)
+        else:
+            diff_score = difficulty_int
+        self.avg_difficulty_faced[i] = (
+            (self.avg_difficulty_faced[i] * (attempts - 1) + diff_score) / 
+            attempts
         )
+        self._knowledge_dirty = True
         
         # Update overall metrics
         self.overall_metrics['total_questions'] += 1
@@ -91,6 +209,49 @@ class LearnerProfile:
             self.overall_metrics['total_correct'] / self.overall_metrics['total_questions']
         )
     
+    def _apply_aggregates(self, concepts: List[str], attempts: np.ndarray,
+                          correct: np.ndarray, total_time: np.ndarray,
+                          avg_difficulty: np.ndarray, trailing_streak: np.ndarray,
+                          unbroken: np.ndarray, last_timestamps: List):
+        """
+        Fold a batch of per-concept aggregates into the profile
+        
+        Equivalent to calling update_with_interaction for each interaction
+        of the batch in order. trailing_streak is the run of correct answers
+        ending the batch; where unbroken is True the batch had no incorrect
+        answer, so the run extends the existing streak. avg_difficulty is
+        the batch's own mean difficulty per concept.
+        """
+        idx = np.array([self._concept_slot(concept) for concept in concepts], dtype=np.intp)
+        
+        old_attempts = self.attempts[idx]
+        new_attempts = old_attempts + attempts
+        # Concepts seen for the first time take the batch mean as is
+        self.avg_difficulty_faced[idx] = np.where(
+            old_attempts == 0,
+            avg_difficulty,
+            (self.avg_difficulty_faced[idx] * old_attempts + avg_difficulty * attempts) /
+            new_attempts
+        )
+        self.attempts[idx] = new_attempts
+        self.correct[idx] += correct
+        self.incorrect[idx] += attempts - correct
+        self.total_time[idx] += total_time
+        self.streak[idx] = np.where(unbroken, self.streak[idx] + trailing_streak, trailing_streak)
+        for i, timestamp in zip(idx.tolist(), last_timestamps):
+            self.last_attempt_timestamp[i] = timestamp
+        self._knowledge_dirty = True
+        
+        # Update overall metrics
+        n_questions = int(attempts.sum())
+        self.overall_metrics['total_questions'] += n_questions
+        self.overall_metrics['total_correct'] += correct.sum().item()
+        self.overall_metrics['total_attempts'] += n_questions
+        self.overall_metrics['total_time_spent'] += total_time.sum().item()
+        self.overall_metrics['average_accuracy'] = (
+            self.overall_metrics['total_correct'] / self.overall_metrics['total_questions']
+        )
+    
     def calculate_mastery_probability(self, concept: str, 
                                      threshold: float = 0.7) -> float:
         """
@@ -104,23 +265,19 @@ class LearnerProfile:
         Returns:
             Mastery probability (0-1)
         """
-        if concept not in self.concept_metrics or self.concept_metrics[concept]['attempts'] == 0:
+        i = self._concept_index.get(concept)
+        if i is None or self.attempts[i] == 0:
             return 0.0
         
-        metrics = self.concept_metrics[concept]
-        
         # Accuracy component (0-1)
-        if metrics['attempts'] > 0:
-            accuracy = metrics['correct'] / metrics['attempts']
-        else:
-            accuracy = 0.0
+        accuracy = self.correct[i] / self.attempts[i]
         
         # Recency bonus (encourages recent practice)
         # Streak component (consecutive correct answers)
-        streak_bonus = min(0.1, metrics['streak'] * 0.05)
+        streak_bonus = min(0.1, self.streak[i] * 0.05)
         
         # Effort component (more attempts on difficult topics shows engagement)
-        effort_weight = min(1.0, metrics['attempts'] / 10.0) * 0.1
+        effort_weight = min(1.0, self.attempts[i] / 10.0) * 0.1
         
         # Combine components
         mastery = accuracy + streak_bonus + effort_weight
@@ -128,74 +285,99 @@ class LearnerProfile:
         
         return mastery
     
-    def get_knowledge_state_vector(self) -> Dict[str, float]:
+    def _mastery_array(self) -> np.ndarray:
+        """calculate_mastery_probability for every concept in self.concepts at once"""
+        n_concepts = len(self.concepts)
+        return _mastery(self.attempts[:n_concepts], self.correct[:n_concepts],
+                        self.streak[:n_concepts])
+    
+    def get_knowledge_state_vector(self) -> KnowledgeVector:
         """
         Get current knowledge state vector
         Maps each concept to mastery probability
         
         Returns:
-            Dictionary mapping concepts to mastery probabilities
+            KnowledgeVector mapping concepts to mastery probabilities (cached
+            until the next update; treat it as read-only)
         """
-        for concept in self.concepts:
-            self.knowledge_state[concept] = self.calculate_mastery_probability(concept)
+        if self._knowledge_dirty:
+            self.knowledge_state = KnowledgeVector(
+                self.concepts, self._mastery_array(), self._concept_index
+            )
+            self._knowledge_dirty = False
         return self.knowledge_state
     
-    def get_weak_concepts(self, n: int = 3, threshold: float = 0.6) -> List[str]:
+    def get_weak_concepts(self, n: int = 3, threshold: float = 0.6,
+                          knowledge: Optional[Mapping[str, float]] = None) -> List[str]:
         """
         Get weakest concepts for a learner
         
         Args:
             n: Number of weak concepts to return
             threshold: Mastery threshold below which concepts are weak
+            knowledge: Knowledge state vector, if the caller already has it
             
         Returns:
             List of weak concepts sorted by mastery (lowest first)
         """
-        knowledge = self.get_knowledge_state_vector()
-        weak = [(c, m) for c, m in knowledge.items() if m < threshold]
-        weak.sort(key=lambda x: x[1])
-        return [c for c, _ in weak[:n]]
+        if knowledge is None:
+            knowledge = self.get_knowledge_state_vector()
+        return _select_concepts(knowledge, lambda m: m < threshold, n, largest=False)
     
-    def get_strong_concepts(self, n: int = 3, threshold: float = 0.75) -> List[str]:
+    def get_strong_concepts(self, n: int = 3, threshold: float = 0.75,
+                            knowledge: Optional[Mapping[str, float]] = None) -> List[str]:
         """
         Get strongest concepts for a learner
         
         Args:
             n: Number of strong concepts to return
             threshold: Mastery threshold above which concepts are strong
+            knowledge: Knowledge state vector, if the caller already has it
             
         Returns:
             List of strong concepts sorted by mastery (highest first)
         """
-        knowledge = self.get_knowledge_state_vector()
-        strong = [(c, m) for c, m in knowledge.items() if m >= threshold]
-        strong.sort(key=lambda x: x[1], reverse=True)
-        return [c for c, _ in strong[:n]]
+        if knowledge is None:
+            knowledge = self.get_knowledge_state_vector()
+        return _select_concepts(knowledge, lambda m: m >= threshold, n, largest=True)
     
     def get_concept_statistics(self, concept: str) -> Dict:
         """Get detailed statistics for a specific concept"""
-        if concept not in self.concept_metrics:
+        i = self._concept_index.get(concept)
+        if i is None or self.attempts[i] == 0:
             return None
         
-        metrics = self.concept_metrics[concept]
+        attempts = int(self.attempts[i])
         return {
             'concept': concept,
-            'total_attempts': metrics['attempts'],
-            'correct_attempts': metrics['correct'],
-            'accuracy': metrics['correct'] / metrics['attempts'] if metrics['attempts'] > 0 else 0.0,
-            'avg_time_spent': metrics['total_time'] / metrics['attempts'] if metrics['attempts'] > 0 else 0,
-            'difficulty_faced': metrics['avg_difficulty_faced'],
-            'current_streak': metrics['streak'],
+            'total_attempts': attempts,
+            'correct_attempts': int(self.correct[i]),
+            'accuracy': self.correct[i] / attempts,
+            'avg_time_spent': self.total_time[i] / attempts,
+            'difficulty_faced': float(self.avg_difficulty_faced[i]),
+            'current_streak': int(self.streak[i]),
             'mastery_probability': self.calculate_mastery_probability(concept)
         }
     
+    def metrics_frame(self) -> pd.DataFrame:
+        """
+        Per-concept metrics as a DataFrame indexed by concept
+        
+        Returns:
+            DataFrame with attempts, correct, incorrect, total_time,
+            avg_difficulty_faced, streak and mastery columns (mastery is NaN
+            for concepts outside self.concepts)
+        """
+        concepts, columns = _stack_metrics([self])
+        return pd.DataFrame(columns, index=pd.Index(concepts, name='concept'))
+    
     def to_dict(self) -> Dict:
         """Convert profile to dictionary for serialization"""
         return {
             'student_id': self.student_id,
             'overall_metrics': self.overall_metrics,
-            'concept_metrics': dict(self.concept_metrics),
-            'knowledge_state': self.get_knowledge_state_vector()
+            'concept_metrics': self.concept_metrics,
+            'knowledge_state': self.get_knowledge_state_vector().to_dict()
         }
 
 
@@ -226,14 +408,59 @@ class LearnerProfileManager:
             interactions_df: DataFrame with columns:
                 student_id, concept, score, time_spent, difficulty, timestamp
         """
-        for _, row in interactions_df.iterrows():
-            profile = self.get_or_create_profile(row['student_id'])
-            profile.update_with_interaction(
-                concept=row['concept'],
-                correct=row['score'],
-                time_spent=row['time_spent'],
-                difficulty=row['difficulty'],
-                timestamp=row.get('timestamp')
+        if len(interactions_df) == 0:
+            return
+        
+        scores = interactions_df['score'].to_numpy()
+        frame = pd.DataFrame({
+            'student_id': interactions_df['student_id'].to_numpy(),
+            'concept': interactions_df['concept'].to_numpy(),
+            'score': scores,
+            'time_spent': interactions_df['time_spent'].to_numpy(),
+            'diff_score': encode_difficulty(interactions_df['difficulty']),
+            'position': np.arange(len(interactions_df))
+        })
+        
+        # One aggregation per (student, concept) pair, in order of first appearance
+        grouped = frame.groupby(['student_id', 'concept'], sort=False, dropna=False)
+        agg = grouped.agg(
+            attempts=('score', 'size'),
+            correct=('score', 'sum'),
+            total_time=('time_spent', 'sum'),
+            avg_difficulty=('diff_score', 'mean'),
+            last_position=('position', 'max')
+        )
+        
+        # Streak after the batch = rows following the pair's last incorrect
+        # answer, i.e. the smallest distance-from-end among incorrect rows
+        from_end = grouped.cumcount(ascending=False).to_numpy()
+        incorrect = scores == 0
+        trailing = pd.Series(from_end[incorrect]).groupby(
+            [frame['student_id'][incorrect].to_numpy(), frame['concept'][incorrect].to_numpy()],
+            sort=False, dropna=False
+        ).min()
+        trailing = trailing.reindex(agg.index)
+        unbroken = trailing.isna().to_numpy()
+        agg['trailing_streak'] = np.where(unbroken, agg['attempts'].to_numpy(), trailing.to_numpy())
+        agg['unbroken'] = unbroken
+        
+        if 'timestamp' in interactions_df:
+            last_timestamps = interactions_df['timestamp'].iloc[agg['last_position'].to_numpy()].tolist()
+        else:
+            last_timestamps = [None] * len(agg)
+        agg['last_timestamp'] = pd.Series(last_timestamps, index=agg.index, dtype=object)
+        
+        for student_id, rows in agg.groupby(level=0, sort=False, dropna=False):
+            profile = self.get_or_create_profile(student_id)
+            profile._apply_aggregates(
+                concepts=rows.index.get_level_values(1).tolist(),
+                attempts=rows['attempts'].to_numpy(),
+                correct=rows['correct'].to_numpy().astype(np.int64),
+                total_time=rows['total_time'].to_numpy(),
+                avg_difficulty=rows['avg_difficulty'].to_numpy(),
+                trailing_streak=rows['trailing_streak'].to_numpy().astype(np.int64),
+                unbroken=rows['unbroken'].to_numpy(),
+                last_timestamps=rows['last_timestamp'].tolist()
             )
     
     def get_learner_profiles_summary(self) -> pd.DataFrame:
@@ -241,24 +468,56 @@ class LearnerProfileManager:
         Get summary of all learner profiles
         
         Returns:
-            DataFrame with learner statistics
+            DataFrame with learner statistics, one row per profile
         """
-        summaries = []
-        for student_id, profile in self.profiles.items():
-            knowledge = profile.get_knowledge_state_vector()
-            avg_mastery = np.mean(list(knowledge.values()))
-            
-            summaries.append({
-                'student_id': student_id,
-                'total_questions': profile.overall_metrics['total_questions'],
-                'overall_accuracy': profile.overall_metrics['average_accuracy'],
-                'average_mastery': avg_mastery,
-                'total_time_spent': profile.overall_metrics['total_time_spent'],
-                'weak_concepts': ', '.join(profile.get_weak_concepts(n=2)),
-                'strong_concepts': ', '.join(profile.get_strong_concepts(n=2))
-            })
-        
-        return pd.DataFrame(summaries)
+        if not self.profiles:
+            return pd.DataFrame()
+        
+        student_ids = list(self.profiles)
+        mastery = self.concept_metrics_frame()['mastery'].dropna()
+        
+        def top_concepts(selected: pd.Series, ascending: bool) -> pd.Series:
+            # First and second pick per student, ties kept in concept order
+            ranked = selected.sort_values(ascending=ascending, kind='stable')
+            rank = ranked.groupby(level='student_id', sort=False, dropna=False).cumcount().to_numpy()
+            names = pd.Series(
+                ranked.index.get_level_values('concept'),
+                index=ranked.index.get_level_values('student_id')
+            )
+            first = names[rank == 0].reindex(student_ids, fill_value='')
+            second = (', ' + names[rank == 1]).reindex(student_ids, fill_value='')
+            return first + second
+        
+        overall = [profile.overall_metrics for profile in self.profiles.values()]
+        return pd.DataFrame({
+            'student_id': student_ids,
+            'total_questions': [m['total_questions'] for m in overall],
+            'overall_accuracy': [m['average_accuracy'] for m in overall],
+            'average_mastery': mastery.groupby(
+                level='student_id', sort=False, dropna=False
+            ).mean().reindex(student_ids).to_numpy(),
+            'total_time_spent': [m['total_time_spent'] for m in overall],
+            'weak_concepts': top_concepts(mastery[mastery < 0.6], ascending=True).to_numpy(),
+            'strong_concepts': top_concepts(mastery[mastery >= 0.75], ascending=False).to_numpy()
+        })
+    
+    def concept_metrics_frame(self) -> pd.DataFrame:
+        """
+        Per-concept metrics of every learner in one DataFrame
+        
+        Returns:
+            LearnerProfile.metrics_frame rows indexed by (student_id, concept)
+        """
+        profiles = list(self.profiles.values())
+        concepts, columns = _stack_metrics(profiles)
+        student_ids = np.repeat(
+            np.array(list(self.profiles), dtype=object),
+            [len(profile.attempts) for profile in profiles]
+        )
+        index = pd.MultiIndex.from_arrays(
+            [student_ids, concepts], names=['student_id', 'concept']
+        )
+        return pd.DataFrame(columns, index=index)
     
     def export_profiles(self) -> Dict:
         """Export all profiles"""
@@ -289,6 +548,6 @@ if __name__ == '__main__':
     
     print("\nDetailed Profile - Student 1:")
     profile_1 = manager.profiles[1]
-    print(f"Knowledge State: {profile_1.get_knowledge_state_vector()}")
+    print(f"Knowledge State: {profile_1.get_knowledge_state_vector().to_dict()}")
     print(f"Weak Concepts: {profile_1.get_weak_concepts()}")
     print(f"Strong Concepts: {profile_1.get_strong_concepts()}")
@@ -5,10 +5,51 @@ Generates personalized learning paths based on student knowledge and mastery
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Union
 from dataclasses import dataclass
+from functools import cached_property
 import heapq
+from bisect import bisect_right
 from src.courses import CourseManager
+from src.knowledge_vector import KnowledgeVector
+
+
+# (mastery gap, difficulty, weak-concept boost) weights per learning preference
+_PRIORITY_WEIGHTS = {
+    'balanced': (0.5, 0.3, 1.3),
+    'progressive': (0.4, 0.6, 1.0),
+    'review': (1.0, 0.0, 2.0)
+}
+_DEFAULT_PRIORITY_WEIGHTS = (1.0, 0.0, 1.0)
+
+# Bloom level for mastery in [_BLOOM_THRESH[i - 1], _BLOOM_THRESH[i]) is
+# _BLOOM_LABELS[i]; NaN sorts past every threshold and maps to "Create"
+_BLOOM_THRESH = np.array([0.2, 0.4, 0.6, 0.75, 0.9], dtype=np.float64)
+_BLOOM_THRESH_TUPLE = tuple(_BLOOM_THRESH.tolist())
+_BLOOM_LABELS = ("Remember", "Understand", "Apply", "Analyze", "Evaluate", "Create")
+
+# Suggested resources, shared by every node; difficulty above 0.7 adds the extras
+_RESOURCES = ("Video Lecture", "Reading Material", "Practice Problems")
+_HARD_RESOURCES = _RESOURCES + ("Expert Explanation", "Step-by-step Tutorial")
+
+
+def _priority_kernel(mastery: np.ndarray, difficulty: np.ndarray,
+                     weak: np.ndarray, weights: Tuple[float, float, float]) -> np.ndarray:
+    """
+    Priority of each concept: (gap_w * (1 - mastery) + diff_w * difficulty),
+    times the boost for weak concepts
+    
+    Works in one output buffer with in-place ufuncs; the results equal the
+    per-preference formulas of _calculate_concept_priority exactly.
+    """
+    gap_weight, difficulty_weight, weak_boost = weights
+    priority = np.subtract(1.0, mastery)
+    priority *= gap_weight
+    if difficulty_weight:
+        priority += difficulty_weight * difficulty
+    if weak_boost != 1.0:
+        np.multiply(priority, weak_boost, out=priority, where=weak)
+    return priority
 
 
 @dataclass
@@ -22,6 +63,79 @@ class LearningNode:
     priority: float = 0.0
 
 
+# PathArray.status codes
+_STATUS_UNSET, _STATUS_IN_PROGRESS, _STATUS_COMPLETED = -1, 0, 1
+_STATUS_LABELS = {_STATUS_IN_PROGRESS: 'in-progress', _STATUS_COMPLETED: 'completed'}
+
+
+@dataclass
+class PathArray:
+    """
+    Structure-of-arrays form of a learning path
+    
+    Position i of each array describes concepts[i]. nodes holds the legacy
+    node dicts the path was built from; to_nodes() writes the arrays back
+    into them, so the per-node dicts are only touched when a caller needs them.
+    """
+    concepts: List[str]
+    index: np.ndarray     # int32 position in the generator's catalog (-1 if absent)
+    mastery: np.ndarray   # float64
+    bloom: np.ndarray     # int8 index into _BLOOM_LABELS
+    status: np.ndarray    # int8 _STATUS_* code
+    est_time: np.ndarray  # minutes (int64; float64 if any time is fractional)
+    nodes: List[Dict]
+    
+    @classmethod
+    def from_nodes(cls, nodes: List[Dict], index: Dict[str, int]) -> 'PathArray':
+        """
+        Build a path array from legacy node dicts
+        
+        Args:
+            nodes: Learning path nodes
+            index: Concept -> catalog position map
+            
+        Returns:
+            PathArray viewing the same nodes
+        """
+        n = len(nodes)
+        concepts = [node['concept'] for node in nodes]
+        bloom = np.fromiter(
+            (_BLOOM_LABELS.index(node['bloom_level']) for node in nodes), dtype=np.int8, count=n
+        )
+        status = np.fromiter(
+            (_STATUS_COMPLETED if node.get('status') == 'completed'
+             else _STATUS_IN_PROGRESS if 'status' in node else _STATUS_UNSET
+             for node in nodes), dtype=np.int8, count=n
+        )
+        return cls(
+            concepts=concepts,
+            index=np.fromiter((index.get(c, -1) for c in concepts), dtype=np.int32, count=n),
+            mastery=np.fromiter((node['current_mastery'] for node in nodes), dtype=np.float64, count=n),
+            bloom=bloom,
+            status=status,
+            est_time=np.array([node['estimated_time'] for node in nodes]),
+            nodes=nodes
+        )
+    
+    def __len__(self) -> int:
+        return len(self.concepts)
+    
+    @cached_property
+    def total_time(self):
+        """Estimated minutes for the whole path (est_time never changes after construction)"""
+        return self.est_time.sum().item() if len(self.est_time) else 0
+    
+    def to_nodes(self) -> List[Dict]:
+        """Sync the arrays into the node dicts and return them as a new list"""
+        for node, mastery, bloom, status in zip(self.nodes, self.mastery.tolist(),
+                                                self.bloom.tolist(), self.status.tolist()):
+            node['current_mastery'] = mastery
+            node['bloom_level'] = _BLOOM_LABELS[bloom]
+            if status != _STATUS_UNSET:
+                node['status'] = _STATUS_LABELS[status]
+        return list(self.nodes)
+
+
 class LearningPathGenerator:
     """
     Generates personalized learning paths based on:
@@ -60,6 +174,137 @@ class LearningPathGenerator:
         self.estimated_times = estimated_times or {
             c: 30 for c in concepts
         }
+        
+        # Array view of the catalog for vectorised scoring; the dicts above
+        # are read once here, so replace the generator to change them
+        self._concept_index = {c: i for i, c in enumerate(concepts)}
+        self._difficulty = np.array(
+            [self.concept_difficulty.get(c, np.nan) for c in concepts], dtype=np.float64
+        )
+        self._has_difficulty = np.array(
+            [c in self.concept_difficulty for c in concepts], dtype=bool
+        )
+        
+        # Node fields by catalog position, so paths are built by indexing
+        # (None where a concept has no difficulty / prerequisite entry)
+        self._difficulty_values = [self.concept_difficulty.get(c) for c in concepts]
+        self._prereq_lists = [self.prerequisites.get(c) for c in concepts]
+        self._times = [self.estimated_times.get(c, 30) for c in concepts]
+        self._index_prerequisites()
+    
+    def _index_prerequisites(self):
+        """
+        Encode prerequisites as CSR arrays over prerequisite nodes
+        
+        Concept i's prerequisites are nodes _prereq_indices[_prereq_indptr[i]:
+        _prereq_indptr[i + 1]]. Nodes are self.concepts followed by any
+        prerequisite names outside the catalog (_external_prereqs), whose
+        mastery is still read from the student's knowledge.
+        """
+        node_index = dict(self._concept_index)
+        self._external_prereqs: List[str] = []
+        indptr = [0]
+        indices = []
+        for concept in self.concepts:
+            for prereq in self.prerequisites.get(concept) or []:
+                node = node_index.get(prereq)
+                if node is None:
+                    node = node_index[prereq] = len(self.concepts) + len(self._external_prereqs)
+                    self._external_prereqs.append(prereq)
+                indices.append(node)
+            indptr.append(len(indices))
+        
+        # Every node whose mastery a prerequisite check can read
+        self._prereq_nodes = list(self.concepts) + self._external_prereqs
+        self._node_index = node_index
+        
+        self._prereq_indptr = np.array(indptr, dtype=np.int32)
+        self._prereq_indices = np.array(indices, dtype=np.int32)
+        # Concept owning each prerequisite edge
+        self._prereq_owner = np.repeat(
+            np.arange(len(self.concepts), dtype=np.int32), np.diff(self._prereq_indptr)
+        )
+    
+    def _prerequisites_met(self, mastery: np.ndarray,
+                           student_knowledge: Dict[str, float],
+                           mastery_threshold: float = 0.6) -> np.ndarray:
+        """
+        _check_prerequisites_met for every concept at once
+        
+        Args:
+            mastery: Mastery vector of self.concepts
+            student_knowledge: Current knowledge state (for prerequisites
+                outside the catalog)
+            mastery_threshold: Required mastery of prerequisites
+            
+        Returns:
+            Boolean array, True where all prerequisites are met
+        """
+        if isinstance(student_knowledge, KnowledgeVector) and student_knowledge.concepts is self._prereq_nodes:
+            mastery = student_knowledge.array
+        elif self._external_prereqs:
+            mastery = np.concatenate([mastery, np.fromiter(
+                (student_knowledge.get(p, 0.0) for p in self._external_prereqs),
+                dtype=np.float64, count=len(self._external_prereqs)
+            )])
+        unmet = mastery[self._prereq_indices] < mastery_threshold
+        return np.bincount(self._prereq_owner[unmet], minlength=len(self.concepts)) == 0
+    
+    def knowledge_vector(self, student_knowledge: Dict[str, float]) -> KnowledgeVector:
+        """
+        Student knowledge as an array over this generator's catalog
+        
+        The vector also covers prerequisites outside the catalog, and can be
+        passed anywhere student_knowledge is accepted without conversion.
+        
+        Args:
+            student_knowledge: Current mastery for each concept
+            
+        Returns:
+            KnowledgeVector (0.0 for concepts missing from student_knowledge)
+        """
+        nodes = self._prereq_nodes
+        return KnowledgeVector(nodes, np.fromiter(
+            (student_knowledge.get(c, 0.0) for c in nodes), dtype=np.float64, count=len(nodes)
+        ), self._node_index)
+    
+    def _mastery_vector(self, student_knowledge: Dict[str, float]) -> np.ndarray:
+        """Mastery of each concept in self.concepts (0.0 when unknown)"""
+        if isinstance(student_knowledge, KnowledgeVector):
+            if student_knowledge.concepts is self._prereq_nodes:
+                return student_knowledge.array[:len(self.concepts)]
+            if student_knowledge.concepts == self.concepts:
+                return student_knowledge.array
+        return np.fromiter(
+            (student_knowledge.get(c, 0.0) for c in self.concepts),
+            dtype=np.float64, count=len(self.concepts)
+        )
+    
+    def _concept_id(self, concept: Union[str, int]) -> int:
+        """Catalog position of a concept given by name or position (KeyError if unknown)"""
+        if isinstance(concept, (int, np.integer)):
+            if not 0 <= concept < len(self.concepts):
+                raise KeyError(concept)
+            return int(concept)
+        return self._concept_index[concept]
+    
+    def _concept_name(self, concept: Union[str, int]) -> str:
+        """Concept name for a name or catalog position"""
+        if isinstance(concept, (int, np.integer)):
+            return self.concepts[self._concept_id(concept)]
+        return concept
+    
+    def _weak_mask(self, weak_concepts: List[Union[str, int]] = None) -> np.ndarray:
+        """Boolean mask of self.concepts that appear in weak_concepts (names or positions)"""
+        mask = np.zeros(len(self.concepts), dtype=bool)
+        if weak_concepts:
+            n = len(self.concepts)
+            ids = [
+                c if isinstance(c, (int, np.integer)) else self._concept_index.get(c)
+                for c in weak_concepts
+            ]
+            mask[[i for i in ids if i is not None and 0 <= i < n]] = True
+        return mask
     
     def generate_path(self, student_knowledge: Dict[str, float],
                      weak_concepts: List[str] = None,
@@ -79,49 +324,53 @@ class LearningPathGenerator:
         Returns:
             List of learning path nodes
         """
-        path = []
-        candidate_concepts = []
+        mastery = self._mastery_vector(student_knowledge)
         
-        # Score each concept for inclusion in path
-        for concept in self.concepts:
-            # Skip if already mastered
-            if student_knowledge.get(concept, 0.0) >= 0.85:
-                continue
-            
-            # Skip if too difficult
-            if self.concept_difficulty[concept] > max_difficulty:
-                continue
-            
-            # Check prerequisites
-            prereqs_met = self._check_prerequisites_met(
-                concept, student_knowledge
-            )
-            if not prereqs_met:
-                continue
-            
-            # Calculate priority score
-            priority = self._calculate_concept_priority(
-                concept, student_knowledge, weak_concepts, learning_preference
-            )
-            
-            candidate_concepts.append((concept, priority))
+        # Skip concepts already mastered
+        candidates = ~(mastery >= 0.85)
+        missing = candidates & ~self._has_difficulty
+        if missing.any():
+            raise KeyError(self.concepts[int(np.argmax(missing))])
+        
+        # Skip concepts too difficult
+        candidates &= ~(self._difficulty > max_difficulty)
+        
+        # Check prerequisites
+        candidates &= self._prerequisites_met(mastery, student_knowledge)
+        candidate_idx = np.flatnonzero(candidates)
+        
+        # Priority of every candidate at once
+        key = -self._calculate_concept_priorities(
+            mastery[candidate_idx], self._difficulty[candidate_idx],
+            self._weak_mask(weak_concepts)[candidate_idx], learning_preference
+        )
         
-        # Sort by priority (higher first)
-        candidate_concepts.sort(key=lambda x: x[1], reverse=True)
+        # Only the top num_concepts need ordering: partition finds the
+        # cut-off, keeping everything tied with it (a NaN cut-off means
+        # the top is padded with NaN priorities, so keep them all)
+        if 0 < num_concepts < len(key):
+            cutoff = np.partition(key, num_concepts - 1)[num_concepts - 1]
+            if not np.isnan(cutoff):
+                keep = key <= cutoff
+                candidate_idx, key = candidate_idx[keep], key[keep]
         
-        # Select top concepts
-        selected = [c for c, _ in candidate_concepts[:num_concepts]]
+        # Highest first (stable, so ties keep catalog order)
+        ranked = candidate_idx[np.argsort(key, kind='stable')]
+        
+        # Select top concepts (as catalog positions)
+        selected = ranked[:num_concepts].tolist()
         
         # Order selected concepts
         path = self._topological_sort_concepts(selected, student_knowledge)
         
         return path
     
-    def _check_prerequisites_met(self, concept: str,
+    def _check_prerequisites_met(self, concept: Union[str, int],
                                 student_knowledge: Dict[str, float],
                                 mastery_threshold: float = 0.6) -> bool:
         """
         Check if prerequisites are met for a concept
+        (scalar form of _prerequisites_met)
         
         Args:
             concept: Target concept
@@ -131,7 +380,7 @@ class LearningPathGenerator:
         Returns:
             True if prerequisites are met
         """
-        prerequisites = self.prerequisites.get(concept, [])
+        prerequisites = self.prerequisites.get(self._concept_name(concept), [])
         
         if not prerequisites:
             return True
@@ -142,7 +391,7 @@ class LearningPathGenerator:
         
         return True
     
-    def _calculate_concept_priority(self, concept: str,
+    def _calculate_concept_priority(self, concept: Union[str, int],
                                    student_knowledge: Dict[str, float],
                                    weak_concepts: List[str] = None,
                                    preference: str = 'balanced') -> float:
@@ -158,6 +407,7 @@ class LearningPathGenerator:
         Returns:
             Priority score (higher = higher priority)
         """
+        concept = self._concept_name(concept)
         current_mastery = student_knowledge.get(concept, 0.0)
         difficulty = self.concept_difficulty[concept]
         
@@ -187,59 +437,109 @@ class LearningPathGenerator:
         
         return priority
     
-    def _topological_sort_concepts(self, concepts: List[str],
+    @staticmethod
+    def _calculate_concept_priorities(mastery: np.ndarray, difficulty: np.ndarray,
+                                      weak: np.ndarray,
+                                      preference: str = 'balanced') -> np.ndarray:
+        """
+        _calculate_concept_priority over arrays of concepts
+        
+        Args:
+            mastery: Current mastery of each concept
+            difficulty: Difficulty of each concept
+            weak: True where the concept is a weak concept
+            preference: Learning preference
+            
+        Returns:
+            Priority score of each concept (higher = higher priority)
+        """
+        weights = _PRIORITY_WEIGHTS.get(preference, _DEFAULT_PRIORITY_WEIGHTS)
+        return _priority_kernel(mastery, difficulty, weak, weights)
+    
+    def _topological_sort_concepts(self, concepts: List[Union[str, int]],
                                   student_knowledge: Dict[str, float]) -> List[Dict]:
         """
         Sort concepts respecting prerequisites
         Easier concepts first, then progress to harder
         
+        Kahn's algorithm over the prerequisite edges inside the set: a
+        concept is placed only after its prerequisites in the set, and among
+        the concepts ready to place the easiest (then the one with the
+        largest mastery gap, then the earliest given) goes first.
+        
         Args:
-            concepts: Concepts to sort
+            concepts: Catalog concepts to sort, by name or position
             student_knowledge: Current knowledge state
             
         Returns:
             Sorted list of concept nodes
         """
-        # Build dependency graph for selected concepts
-        concept_set = set(concepts)
-        
-        # Add prerequisites that are in the concept set
-        for concept in concepts:
-            for prereq in self.prerequisites.get(concept, []):
-                if prereq in concept_set:
-                    # Prerequisites already satisfied, no need to add
-                    pass
-        
-        # Sort by: prerequisites first, then difficulty, then mastery gap
-        def sort_key(concept):
-            prereq_count = len([p for p in self.prerequisites.get(concept, [])
-                              if p in concept_set])
-            difficulty = self.concept_difficulty[concept]
-            mastery_gap = 1.0 - student_knowledge.get(concept, 0.0)
-            
-            # Tuples are compared lexicographically
-            return (prereq_count, difficulty, -mastery_gap)
+        ids = [self._concept_id(concept) for concept in concepts]
+        names = [self.concepts[c] for c in ids]
+        difficulty = self._difficulty_values
+        for c in ids:
+            if difficulty[c] is None:
+                raise KeyError(self.concepts[c])
+        mastery = [student_knowledge.get(name, 0.0) for name in names]
+        
+        n = len(ids)
+        keys = [
+            (difficulty[c], -(1.0 - m), i)
+            for i, (c, m) in enumerate(zip(ids, mastery))
+        ]
         
-        sorted_concepts = sorted(concepts, key=sort_key)
+        # Prerequisite edges between the given concepts, from the CSR arrays
+        position = {c: i for i, c in enumerate(ids)}
+        indegree = [0] * n
+        dependents = [[] for _ in range(n)]
+        indptr, indices = self._prereq_indptr, self._prereq_indices
+        for node, i in position.items():
+            for prereq in indices[indptr[node]:indptr[node + 1]].tolist():
+                j = position.get(prereq)
+                if j is not None and j != i:
+                    indegree[i] += 1
+                    dependents[j].append(i)
+        
+        ready = [keys[i] for i in range(n) if indegree[i] == 0]
+        heapq.heapify(ready)
+        placed = [False] * n
+        order = []
+        while len(order) < n:
+            if not ready:
+                # Prerequisite cycle: release the easiest remaining concept
+                i = min(keys[i] for i in range(n) if not placed[i])[2]
+                indegree[i] = 0
+                heapq.heappush(ready, keys[i])
+            i = heapq.heappop(ready)[2]
+            if placed[i]:
+                continue
+            placed[i] = True
+            order.append(i)
+            for j in dependents[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    heapq.heappush(ready, keys[j])
         
         # Create learning path nodes
         path = []
-        for idx, concept in enumerate(sorted_concepts):
+        for idx, i in enumerate(order):
+            c = ids[i]
+            prerequisites = self._prereq_lists[c]
             node = {
                 'position': idx + 1,
-                'concept': concept,
-                'difficulty': self.concept_difficulty[concept],
-                'current_mastery': student_knowledge.get(concept, 0.0),
-                'estimated_time': self.estimated_times.get(concept, 30),
-                'prerequisites': self.prerequisites.get(concept, []),
-                'bloom_level': self._estimate_bloom_level(concept, student_knowledge),
-                'resources': self._suggest_resources(concept)
+                'concept': names[i],
+                'difficulty': difficulty[c],
+                'current_mastery': mastery[i],
+                'estimated_time': self._times[c],
+                'prerequisites': prerequisites if prerequisites is not None else [],
+                'bloom_level': _BLOOM_LABELS[bisect_right(_BLOOM_THRESH_TUPLE, mastery[i])],
+                'resources': _HARD_RESOURCES if difficulty[c] > 0.7 else _RESOURCES
             }
             path.append(node)
         
         return path
     
-    def _estimate_bloom_level(self, concept: str,
+    def _estimate_bloom_level(self, concept: Union[str, int],
                             student_knowledge: Dict[str, float]) -> str:
         """
         Estimate appropriate Bloom's taxonomy level
@@ -252,22 +552,12 @@ class LearningPathGenerator:
         Returns:
             Bloom level (Remember, Understand, Apply, Analyze, Evaluate, Create)
         """
-        mastery = student_knowledge.get(concept, 0.0)
-        
-        if mastery < 0.2:
-            return "Remember"
-        elif mastery < 0.4:
-            return "Understand"
-        elif mastery < 0.6:
-            return "Apply"
-        elif mastery < 0.75:
-            return "Analyze"
-        elif mastery < 0.9:
-            return "Evaluate"
-        else:
-            return "Create"
+        mastery = student_knowledge.get(self._concept_name(concept), 0.0)
+        
+        # bisect on the tuple avoids numpy call overhead for a single value
+        return _BLOOM_LABELS[bisect_right(_BLOOM_THRESH_TUPLE, mastery)]
     
-    def _suggest_resources(self, concept: str) -> List[str]:
+    def _suggest_resources(self, concept: Union[str, int]) -> Tuple[str, ...]:
         """
         Suggest learning resources for a concept
         
@@ -275,17 +565,12 @@ class LearningPathGenerator:
             concept: Target concept
             
         Returns:
-            List of suggested resource types
+            Suggested resource types (a shared tuple; copy before editing)
         """
-        resources = ["Video Lecture", "Reading Material", "Practice Problems"]
-        
         # Customize based on difficulty
-        difficulty = self.concept_difficulty[concept]
-        if difficulty > 0.7:
-            resources.append("Expert Explanation")
-            resources.append("Step-by-step Tutorial")
-        
-        return resources
+        if self.concept_difficulty[self._concept_name(concept)] > 0.7:
+            return _HARD_RESOURCES
+        return _RESOURCES
     
     def adapt_path(self, current_path: List[Dict],
                   latest_performance: Dict[str, float],
@@ -301,30 +586,63 @@ class LearningPathGenerator:
         Returns:
             Adapted learning path
         """
+        new_mastery = [
+            latest_performance.get(node['concept'], node['current_mastery'])
+            for node in current_path
+        ]
+        mastery = np.array(new_mastery, dtype=np.float64)
+        
+        # Bloom level and completion for the whole path at once
+        levels = np.searchsorted(_BLOOM_THRESH, mastery, side='right').tolist()
+        completed = (mastery >= 0.85).tolist()
+        
         adapted_path = []
         
-        for node in current_path:
-            concept = node['concept']
-            new_mastery = latest_performance.get(concept, node['current_mastery'])
-            
-            # Update mastery
-            node['current_mastery'] = new_mastery
-            
-            # Update Bloom level
-            node['bloom_level'] = self._estimate_bloom_level(concept, 
-                                                            {concept: new_mastery})
+        for node, value, level, done in zip(current_path, new_mastery, levels, completed):
+            node['current_mastery'] = value
+            node['bloom_level'] = _BLOOM_LABELS[level]
             
-            # Decide if should remove concept or adjust difficulty
-            if new_mastery >= 0.85:
-                # Concept mastered, mark for completion
-                node['status'] = 'completed'
-            else:
-                node['status'] = 'in-progress'
+            # Concept mastered, mark for completion
+            node['status'] = 'completed' if done else 'in-progress'
             
             adapted_path.append(node)
         
         return adapted_path
     
+    def path_array(self, path: List[Dict]) -> PathArray:
+        """Structure-of-arrays view of a learning path over this catalog"""
+        return PathArray.from_nodes(path, self._node_index)
+    
+    def adapt_path_array(self, path: PathArray,
+                         latest_performance: Dict[str, float]) -> PathArray:
+        """
+        Adapt a PathArray in place based on performance
+        
+        Same rules as adapt_path, applied to whole arrays.
+        
+        Args:
+            path: Path to update
+            latest_performance: Recent performance metrics; a vector from
+                knowledge_vector() is gathered without per-concept lookups
+            
+        Returns:
+            The updated path
+        """
+        if (isinstance(latest_performance, KnowledgeVector)
+                and latest_performance.concepts is self._prereq_nodes
+                and path.index.min(initial=0) >= 0):
+            mastery = latest_performance.array[path.index]
+        else:
+            mastery = np.fromiter(
+                (latest_performance.get(c, m) for c, m in zip(path.concepts, path.mastery.tolist())),
+                dtype=np.float64, count=len(path)
+            )
+        
+        path.mastery[:] = mastery
+        path.bloom[:] = np.searchsorted(_BLOOM_THRESH, mastery, side='right')
+        path.status[:] = mastery >= 0.85
+        return path
+    
     def get_next_concept(self, current_path: List[Dict],
                         current_mastery: Dict[str, float]) -> Dict:
         """
@@ -351,12 +669,15 @@ class LearningPathGenerator:
         Estimate total time to complete learning path
         
         Args:
-            path: Learning path
+            path: Learning path (node list or PathArray)
             
         Returns:
             Estimated time in minutes
         """
-        total_time = sum(node['estimated_time'] for node in path)
+        if isinstance(path, PathArray):
+            return path.total_time
+        
+        total_time = sum([node['estimated_time'] for node in path])
         return total_time
 
     def generate_course_path(self, course_id: str, student_knowledge: Dict[str, float]) -> List[Dict]:
@@ -398,16 +719,50 @@ class AdaptivePathManager:
         self.path_generator = path_generator
         self.student_paths: Dict[int, List[Dict]] = {}
         self.path_history: Dict[int, List[List[Dict]]] = {}
+        # Mastery per student over the generator's catalog, updated in place
+        self._mastery: Dict[int, KnowledgeVector] = {}
+        # Array form of each student's current path
+        self._paths: Dict[int, PathArray] = {}
+        # Position of the first unmastered node in each student's path
+        self._next_idx: Dict[int, int] = {}
+    
+    def update_mastery(self, student_id: int, changes: Dict[str, float]) -> int:
+        """
+        Write new mastery values into a student's cached vector
+        
+        Args:
+            student_id: Student ID
+            changes: Updated mastery per concept (concepts outside the
+                catalog are ignored)
+            
+        Returns:
+            Number of entries that changed
+        """
+        vector = self._mastery.get(student_id)
+        if vector is None:
+            vector = self._mastery[student_id] = self.path_generator.knowledge_vector(changes)
+            return len(changes)
+        
+        changed = 0
+        for concept, mastery in changes.items():
+            if concept in vector and vector[concept] != mastery:
+                vector[concept] = mastery
+                changed += 1
+        return changed
     
     def create_initial_path(self, student_id: int,
                            student_knowledge: Dict[str, float],
                            weak_concepts: List[str] = None) -> List[Dict]:
         """Create initial learning path for student"""
+        mastery = self.path_generator.knowledge_vector(student_knowledge)
+        self._mastery[student_id] = mastery
         path = self.path_generator.generate_path(
-            student_knowledge, weak_concepts, num_concepts=5
+            mastery, weak_concepts, num_concepts=5
         )
         
         self.student_paths[student_id] = path
+        self._paths[student_id] = self.path_generator.path_array(path)
+        self._advance_next(student_id)
         self.path_history[student_id] = [path.copy()]
         
         return path
@@ -416,10 +771,17 @@ class AdaptivePathManager:
                    current_mastery: Dict[str, float]) -> List[Dict]:
         """Update learning path based on latest performance"""
         current_path = self.student_paths.get(student_id, [])
-        
-        adapted_path = self.path_generator.adapt_path(
-            current_path, current_mastery
-        )
+        path = self._paths.get(student_id)
+        if path is None or path.nodes is not current_path:
+            # student_paths was reassigned; rebuild the arrays from it
+            path = self._paths[student_id] = self.path_generator.path_array(current_path)
+        
+        # The cached vector holds every concept's latest mastery, so the
+        # path arrays gather from it directly
+        self.update_mastery(student_id, current_mastery)
+        self.path_generator.adapt_path_array(path, self._mastery[student_id])
+        adapted_path = path.nodes = path.to_nodes()
+        self._advance_next(student_id)
         
         self.student_paths[student_id] = adapted_path
         self.path_history[student_id].append(adapted_path.copy())
@@ -429,6 +791,38 @@ class AdaptivePathManager:
     def get_student_path(self, student_id: int) -> List[Dict]:
         """Get current learning path for student"""
         return self.student_paths.get(student_id, [])
+    
+    def get_path_duration(self, student_id: int) -> int:
+        """Estimated minutes for a student's current path (0 if none)"""
+        path = self._paths.get(student_id)
+        return path.total_time if path is not None else 0
+    
+    def _advance_next(self, student_id: int):
+        """Recompute the next-concept pointer after the path's mastery changed"""
+        # Same rule as LearningPathGenerator.get_next_concept: the first
+        # node below 0.85 (NaN never counts as pending)
+        pending = self._paths[student_id].mastery < 0.85
+        self._next_idx[student_id] = int(np.argmax(pending)) if pending.any() else len(pending)
+    
+    def get_next_concept(self, student_id: int) -> Dict:
+        """
+        Get the next concept to study in a student's current path
+        
+        The position is kept up to date by create_initial_path and
+        update_path, so polling costs no scan.
+        
+        Args:
+            student_id: Student ID
+            
+        Returns:
+            Next concept node or None if path complete (or no path yet)
+        """
+        path = self._paths.get(student_id)
+        if path is None:
+            return None
+        
+        idx = self._next_idx[student_id]
+        return path.nodes[idx] if idx < len(path) else None
 
 
 if __name__ == '__main__':
@@ -5,13 +5,45 @@ Template-based code archived to: src/archive/template_based_tutor_agent.py
 Backup of original file: src/archive/tutor_agent_backup.py
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import logging
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_BANNER = "=" * 50
+
+# Report layouts; format_map fills the fixed sections in one pass
+_QUIZ_SUMMARY_TMPL = (
+    "\n{banner}\n"
+    "        QUIZ COMPLETION SUMMARY\n"
+    "{banner}\n"
+    "\n📊 PERFORMANCE:\n"
+    "  Accuracy: {accuracy:.1%}\n"
+    "  Questions: {total_questions}\n"
+    "  Time: {avg_time_spent:.0f}s average\n"
+)
+_HDR_AI = "\n💬 AI FEEDBACK:\n"
+_AI_UNAVAILABLE = "\n⚠️ Unable to generate AI feedback at this moment.\n"
+_HDR_NEXT = "\n🎯 NEXT STEPS:\n"
+
+_SESSION_REPORT_TMPL = (
+    "\n{banner}\n"
+    "      LEARNING SESSION REPORT\n"
+    "{banner}\n"
+    "\n📅 Session Summary:\n"
+    "  Total Questions: {total_questions}\n"
+    "  Overall Accuracy: {accuracy:.1%}\n"
+    "  Concepts Covered: {concepts_count}\n"
+    "\n🎖️ Achievements:\n"
+    "{achievements}"
+    "\n💡 Recommendations:\n"
+    "  - Focus on: {weak_concepts}\n"
+    "  - Next: {next_concept}\n"
+    "\n{banner}\n"
+)
+
 
 class PersonalizedTutorAgent:
     """
@@ -75,6 +107,54 @@ class PersonalizedTutorAgent:
             estimated_time=estimated_time
         )
     
+    async def agenerate_immediate_feedback(self,
+                                          is_correct: bool,
+                                          student_response: str = "",
+                                          correct_answer: str = "",
+                                          concept: str = "",
+                                          difficulty: str = "Medium",
+                                          mastery_level: float = 0.5,
+                                          time_spent: int = 30,
+                                          estimated_time: int = 30) -> str:
+        """Async variant of generate_immediate_feedback (see there for arguments)"""
+        return await self.groq_ai.agenerate_immediate_feedback(
+            is_correct=is_correct,
+            student_response=student_response,
+            correct_answer=correct_answer,
+            concept=concept,
+            difficulty=difficulty,
+            mastery_level=mastery_level,
+            time_spent=time_spent,
+            estimated_time=estimated_time
+        )
+    
+    def generate_immediate_feedback_stream(self,
+                                          is_correct: bool,
+                                          student_response: str = "",
+                                          correct_answer: str = "",
+                                          concept: str = "",
+                                          difficulty: str = "Medium",
+                                          mastery_level: float = 0.5,
+                                          time_spent: int = 30,
+                                          estimated_time: int = 30) -> Iterator[str]:
+        """
+        Streaming variant of generate_immediate_feedback (see there for arguments)
+        
+        Yields:
+            Feedback text fragments as they are generated, so the UI can
+            show the first words without waiting for the whole reply
+        """
+        yield from self.groq_ai.generate_immediate_feedback_stream(
+            is_correct=is_correct,
+            student_response=student_response,
+            correct_answer=correct_answer,
+            concept=concept,
+            difficulty=difficulty,
+            mastery_level=mastery_level,
+            time_spent=time_spent,
+            estimated_time=estimated_time
+        )
+    
     def generate_hint(self,
                      concept: str,
                      question: str = "",
@@ -94,7 +174,47 @@ class PersonalizedTutorAgent:
         Returns:
             AI-generated hint text
         """
-        return self.groq_ai.generate_hint(
+        hint = self.groq_ai.generate_hint(
+            concept=concept,
+            question=question,
+            student_attempt=student_attempt,
+            hint_level=hint_level,
+            attempt_number=attempt_number
+        )
+        
+        return self.groq_ai.format_hint(hint, hint_level)
+    
+    async def agenerate_hint(self,
+                            concept: str,
+                            question: str = "",
+                            student_attempt: str = "",
+                            hint_level: int = 1,
+                            attempt_number: int = 1) -> str:
+        """Async variant of generate_hint (see there for arguments)"""
+        hint = await self.groq_ai.agenerate_hint(
+            concept=concept,
+            question=question,
+            student_attempt=student_attempt,
+            hint_level=hint_level,
+            attempt_number=attempt_number
+        )
+        
+        return self.groq_ai.format_hint(hint, hint_level)
+    
+    def generate_hint_stream(self,
+                            concept: str,
+                            question: str = "",
+                            student_attempt: str = "",
+                            hint_level: int = 1,
+                            attempt_number: int = 1) -> Iterator[str]:
+        """
+        Streaming variant of generate_hint (see there for arguments)
+        
+        Yields:
+            The hint level prefix, then hint text fragments as they arrive
+        """
+        yield self.groq_ai.format_hint("", hint_level)
+        yield from self.groq_ai.generate_hint_stream(
             concept=concept,
             question=question,
             student_attempt=student_attempt,
@@ -123,6 +243,10 @@ class PersonalizedTutorAgent:
             detail_level=detail_level
         )
     
+    def clear_explanation_cache(self):
+        """Forget cached explanations so the next requests are regenerated"""
+        self.groq_ai.clear_explanation_cache()
+    
     def generate_next_steps(self,
                           concept: str,
                           mastery_level: float,
@@ -150,6 +274,21 @@ class PersonalizedTutorAgent:
             total_questions=total_questions
         )
     
+    async def agenerate_next_steps(self,
+                                 concept: str,
+                                 mastery_level: float,
+                                 weak_areas: List[str],
+                                 available_concepts: List[str],
+                                 total_questions: int = 0) -> str:
+        """Async variant of generate_next_steps (see there for arguments)"""
+        return await self.groq_ai.agenerate_next_steps(
+            concept=concept,
+            mastery_level=mastery_level,
+            weak_areas=weak_areas,
+            available_concepts=available_concepts,
+            total_questions=total_questions
+        )
+    
     def generate_motivational_message(self,
                                      mastery_level: float,
                                      total_questions: int,
@@ -177,6 +316,36 @@ class PersonalizedTutorAgent:
             recent_performance=recent_performance
         )
     
+    async def agenerate_motivational_message(self,
+                                            mastery_level: float,
+                                            total_questions: int,
+                                            accuracy: float,
+                                            streak: int = 0,
+                                            recent_performance: Optional[str] = None) -> str:
+        """Async variant of generate_motivational_message (see there for arguments)"""
+        return await self.groq_ai.agenerate_motivational_message(
+            mastery_level=mastery_level,
+            total_questions=total_questions,
+            accuracy=accuracy,
+            streak=streak,
+            recent_performance=recent_performance
+        )
+    
+    def generate_motivational_message_stream(self,
+                                            mastery_level: float,
+                                            total_questions: int,
+                                            accuracy: float,
+                                            streak: int = 0,
+                                            recent_performance: Optional[str] = None) -> Iterator[str]:
+        """Streaming variant of generate_motivational_message (see there for arguments)"""
+        yield from self.groq_ai.generate_motivational_message_stream(
+            mastery_level=mastery_level,
+            total_questions=total_questions,
+            accuracy=accuracy,
+            streak=streak,
+            recent_performance=recent_performance
+        )
+    
     def analyze_error_pattern(self,
                             concept: str,
                             errors: List[str],
@@ -214,40 +383,76 @@ class PersonalizedTutorAgent:
         Returns:
             Formatted completion summary
         """
-        summary = "\n" + "="*50 + "\n"
-        summary += "        QUIZ COMPLETION SUMMARY\n"
-        summary += "="*50 + "\n"
+        try:
+            mastery_feedback = self.generate_motivational_message(
+                mastery_level=quiz_stats['accuracy'],
+                total_questions=quiz_stats['total_questions'],
+                accuracy=quiz_stats['accuracy']
+            )
+        except Exception as e:
+            logger.error(f"Error generating AI feedback: {e}")
+            mastery_feedback = None
         
-        # Performance
-        summary += f"\n📊 PERFORMANCE:\n"
-        summary += f"  Accuracy: {quiz_stats['accuracy']:.1%}\n"
-        summary += f"  Questions: {quiz_stats['total_questions']}\n"
-        summary += f"  Time: {quiz_stats['avg_time_spent']:.0f}s average\n"
+        return self._format_quiz_completion_summary(
+            quiz_stats, learning_path, weak_concepts, mastery_feedback
+        )
+    
+    async def acreate_quiz_completion_summary(self, quiz_stats: Dict,
+                                             concept: str,
+                                             learning_path: List[Dict],
+                                             weak_concepts: List[str]) -> str:
+        """
+        Async variant of create_quiz_completion_summary (see there for arguments)
         
-        # AI Feedback
+        The summary's AI call can then run alongside others, e.g. with
+        asyncio.gather(agent.agenerate_immediate_feedback(...),
+        agent.acreate_quiz_completion_summary(...)) when a quiz ends.
+        """
         try:
-            mastery_feedback = self.generate_motivational_message(
+            mastery_feedback = await self.agenerate_motivational_message(
                 mastery_level=quiz_stats['accuracy'],
                 total_questions=quiz_stats['total_questions'],
                 accuracy=quiz_stats['accuracy']
             )
-            summary += f"\n💬 AI FEEDBACK:\n{mastery_feedback}\n"
         except Exception as e:
             logger.error(f"Error generating AI feedback: {e}")
-            summary += f"\n⚠️ Unable to generate AI feedback at this moment.\n"
+            mastery_feedback = None
+        
+        return self._format_quiz_completion_summary(
+            quiz_stats, learning_path, weak_concepts, mastery_feedback
+        )
+    
+    @staticmethod
+    def _format_quiz_completion_summary(quiz_stats: Dict,
+                                        learning_path: List[Dict],
+                                        weak_concepts: List[str],
+                                        mastery_feedback: Optional[str]) -> str:
+        """Lay out the completion summary (mastery_feedback None if the AI call failed)"""
+        # Header and performance
+        parts = [_QUIZ_SUMMARY_TMPL.format(
+            banner=_BANNER,
+            accuracy=quiz_stats['accuracy'],
+            total_questions=quiz_stats['total_questions'],
+            avg_time_spent=quiz_stats['avg_time_spent']
+        )]
+        
+        # AI Feedback
+        if mastery_feedback is not None:
+            parts += [_HDR_AI, mastery_feedback, "\n"]
+        else:
+            parts.append(_AI_UNAVAILABLE)
         
         # Next steps
-        summary += f"\n🎯 NEXT STEPS:\n"
+        parts.append(_HDR_NEXT)
         if learning_path:
             next_concept = learning_path[0].get('concept', 'next topic')
-            summary += f"  1. Move on to: {next_concept}\n"
+            parts.append(f"  1. Move on to: {next_concept}\n")
         if weak_concepts:
-            summary += f"  2. Review weak concepts:\n"
-            for wc in weak_concepts[:2]:
-                summary += f"     - {wc}\n"
-        summary += f"\n"
+            parts.append("  2. Review weak concepts:\n")
+            parts += [f"     - {wc}\n" for wc in weak_concepts[:2]]
+        parts.append("\n")
         
-        return summary
+        return "".join(parts)
     
     def generate_quiz_question(self,
                              concept: str,
@@ -276,27 +481,24 @@ class PersonalizedTutorAgent:
         Returns:
             Formatted session report
         """
-        report = "\n" + "="*50 + "\n"
-        report += "      LEARNING SESSION REPORT\n"
-        report += "="*50 + "\n"
-        
-        report += f"\n📅 Session Summary:\n"
-        report += f"  Total Questions: {student_data.get('total_questions', 0)}\n"
-        report += f"  Overall Accuracy: {student_data.get('accuracy', 0):.1%}\n"
-        report += f"  Concepts Covered: {student_data.get('concepts_count', 0)}\n"
-        
-        report += f"\n🎖️ Achievements:\n"
-        if student_data.get('accuracy', 0) > 0.8:
-            report += "  ⭐ High Achiever - Excellent Performance!\n"
-        if student_data.get('total_questions', 0) >= 10:
-            report += "  🏃 Dedicated Learner - Many questions completed!\n"
+        accuracy = student_data.get('accuracy', 0)
+        total_questions = student_data.get('total_questions', 0)
         
-        report += f"\n💡 Recommendations:\n"
-        report += f"  - Focus on: {', '.join(student_data.get('weak_concepts', []))}\n"
-        report += f"  - Next: {student_data.get('next_concept', 'Continue learning')}\n"
+        achievements = []
+        if accuracy > 0.8:
+            achievements.append("  ⭐ High Achiever - Excellent Performance!\n")
+        if total_questions >= 10:
+            achievements.append("  🏃 Dedicated Learner - Many questions completed!\n")
         
-        report += "\n" + "="*50 + "\n"
-        return report
+        return _SESSION_REPORT_TMPL.format_map({
+            'banner': _BANNER,
+            'total_questions': total_questions,
+            'accuracy': accuracy,
+            'concepts_count': student_data.get('concepts_count', 0),
+            'achievements': "".join(achievements),
+            'weak_concepts': ', '.join(student_data.get('weak_concepts', [])),
+            'next_concept': student_data.get('next_concept', 'Continue learning')
+        })
 
 
 if __name__ == '__main__':